@@ -0,0 +1,71 @@
+import random
+from array import array
+
+import pytest
+
+import yautjadiff
+import yautjatabletv3
+from yautjadiff import diff_bytes, diff_masks
+from yautjaglyphs import NEWLINE_MASK, encode_masks, format_patterns, parse_patterns
+from yautjareplay import StubRoot, _Event, headless
+
+
+def expected_changes(a, b):
+    return [i for i in range(max(len(a), len(b))) if i >= len(a) or i >= len(b) or a[i] != b[i]]
+
+
+def check(diff, a, b):
+    assert diff.old_count == len(a) and diff.new_count == len(b)
+    assert list(diff.changed) == expected_changes(a, b)
+    for k, i in enumerate(diff.changed):
+        assert diff.old_masks[k] == (a[i] if i < len(a) else 0)
+        assert diff.new_masks[k] == (b[i] if i < len(b) else 0)
+
+
+@pytest.mark.parametrize('block', [3, 16384])
+def test_random_edits_match_glyph_by_glyph_compare(monkeypatch, block):
+    monkeypatch.setattr(yautjadiff, 'BLOCK', block)
+    rng = random.Random(32)
+    for _ in range(300):
+        a = encode_masks(''.join(rng.choice('AB\n 7') for _ in range(rng.randint(0, 200))))
+        b = array('I', a)
+        for _ in range(rng.randint(0, 6)):
+            if b:
+                b[rng.randrange(len(b))] = rng.choice([NEWLINE_MASK, rng.randrange(1 << 16)])
+        if rng.random() < 0.3:
+            b.extend(encode_masks('XY\n\n'))
+        if rng.random() < 0.2 and b:
+            del b[-rng.randint(1, 5):]
+        old, new = format_patterns(a).encode(), format_patterns(b).encode()
+        if rng.random() < 0.2:
+            old = old.replace(b'\n', b'\r\n')
+        assert parse_patterns(old) == a
+        check(diff_bytes(old, new), a, b)
+        check(diff_masks(a, b), a, b)
+
+
+def test_insert_shifts_every_later_glyph():
+    a = encode_masks('THE QUICK BROWN FOX\n\n\nJUMPS\n' * 2000)
+    b = array('I', a)
+    b.insert(10, 5)
+    check(diff_bytes(format_patterns(a).encode(), format_patterns(b).encode()), a, b)
+
+
+def test_bad_line_is_reported_by_number():
+    with pytest.raises(ValueError, match='line 2: expected 16 segment bits'):
+        parse_patterns(b'0000000000000000\n0101\n')
+    with pytest.raises(ValueError, match='line 3: expected 16 segment bits'):
+        diff_bytes(b'0000000000000000\n\n00000000000000x0\n', b'0000000000000000\n\n\n')
+
+
+def test_backspace_clears_compare_marks():
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=None)
+        app.load_content('ABCDEF')
+        app.diff_marks = {2, 4}
+        app.cursor_index = 3
+        app.on_key(_Event(char='X', keysym='X'))   # overtyping keeps every index
+        assert app.diff_marks == {2, 4}
+        app.on_backspace(_Event())
+        assert app.diff_marks == set()
+        app.on_close()
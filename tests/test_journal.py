@@ -0,0 +1,73 @@
+import random
+
+import yautjatabletv3
+from yautjajournal import Journal, _generations
+from yautjaglyphs import char_to_mask, encode_masks
+from yautjareplay import StubRoot, StubWidget, _Event, headless
+
+
+def test_compaction_folds_journals_without_the_document(tmp_path):
+    rng = random.Random(33)
+    content = list('HELLO WORLD\nYAUTJA\n' * 10)
+    masks = encode_masks(''.join(content))
+    journal = Journal(str(tmp_path), interval=60, compact_bytes=17 * 20)
+    journal.reset(content, masks)
+    for _ in range(300):
+        i = rng.randrange(1, len(content))
+        if rng.random() < 0.3:
+            del content[i]
+            masks.pop(i)
+            journal.log_delete(i)
+        else:
+            content[i] = rng.choice('ABC ')
+            masks[i] = char_to_mask(content[i])
+            journal.log_set(i, masks[i], content[i])
+        if journal.wants_compaction:
+            journal.compact()   # takes nothing from the editor
+            journal.wait()
+    journal.wait()
+    assert journal.error is None and journal.generation > 3
+    assert len(_generations(str(tmp_path), 'snapshot')) == 1
+    journal.close()
+
+    recovered, recovered_masks, _ = Journal(str(tmp_path)).recover()
+    assert recovered == content and recovered_masks == masks
+
+
+def test_compaction_failure_is_recorded(tmp_path):
+    journal = Journal(str(tmp_path), interval=60)
+    journal.compact()   # no snapshot to fold the journal into
+    journal.wait()
+    assert isinstance(journal.error, OSError)
+    journal.close(discard=True)
+
+
+class Label(StubWidget):
+    def config(self, text=None, **kwargs):
+        self.text = text
+
+
+def test_tablet_shows_autosave_errors(tmp_path):
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=str(tmp_path))
+        app.info_label = Label()
+        app.journal.error = OSError(28, 'No space left on device')
+        app.blink_cursor()
+        assert 'Autosave failed' in app.info_label.text
+        assert 'No space left' in app.info_label.text
+        assert app.journal.error is None
+        app.on_close()
+
+
+def test_typed_characters_stay_one_glyph(tmp_path):
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=str(tmp_path))
+        app.load_content('ABCD')
+        for char in 'ßaﬁ':   # upper() gives 'SS', 'A', 'FI'
+            app.on_key(_Event(char=char, keysym=char))
+        assert app.content == ['ß', 'A', 'ﬁ', 'D'] and len(app.masks) == 4
+        assert app.cursor_index == 3
+        app.journal.commit()
+        content, masks, edits = Journal(app.journal.directory).recover()
+        assert (content, masks, edits) == (app.content, app.masks, 3)
+        app.on_close()
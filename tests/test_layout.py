@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+import yautjalayout
+from yautjalayout import LayoutIndex
+
+
+def reference(content, cpl):
+    """(row, col) per glyph and the row count, laid out one glyph at a time."""
+    pos, row, col = [], 0, 0
+    for ch in content:
+        if col == cpl:
+            row, col = row + 1, 0
+        pos.append((row, col))
+        col += 1
+        if ch == '\n':
+            row, col = row + 1, 0
+    return pos, row + 1
+
+
+def row_text(content, cpl):
+    pos, rows = reference(content, cpl)
+    text = [''] * rows
+    for ch, (row, _) in zip(content, pos):
+        text[row] += ch
+    return text
+
+
+def check_touched(before, after, touched):
+    """Rows outside ``touched`` look the same; open-ended only if the row count changed."""
+    first, last = touched
+    assert before[:first] == after[:first]
+    assert (last is None) == (len(before) != len(after))
+    if last is not None:
+        assert before[last + 1:] == after[last + 1:]
+
+
+@pytest.mark.parametrize('block_lines', [2, 64])
+def test_edits_match_reference(monkeypatch, block_lines):
+    monkeypatch.setattr(yautjalayout, 'BLOCK_LINES', block_lines)
+    rng = random.Random(1)
+    for _ in range(100):
+        content = list(''.join(rng.choice('AB\n ') for _ in range(rng.randint(0, 60))))
+        cpl = rng.randint(1, 7)
+        layout = LayoutIndex(content, cpl)
+        for _ in range(20):
+            pos, rows = reference(content, cpl)
+            assert layout.rows == rows
+            assert [layout.position(i) for i in range(len(content))] == pos
+            assert list(layout.iter_rows()) == [(r,) + layout.row_range(r) for r in range(rows)]
+            starts = [0] + [i + 1 for i, ch in enumerate(content) if ch == '\n']
+            assert [layout.line_start(n) for n in range(layout.lines)] == starts
+            op = rng.random()
+            before = row_text(content, cpl)
+            if op < 0.3 and content:
+                i = rng.randrange(len(content))
+                new = rng.choice('A\n')
+                touched = layout.replace(i, content[i], new)
+                content[i] = new
+                check_touched(before, row_text(content, cpl), touched)
+            elif op < 0.7 and content:
+                i = rng.randrange(len(content))
+                touched = layout.delete(i, content[i])
+                content.pop(i)
+                check_touched(before, row_text(content, cpl), touched)
+            else:
+                cpl = rng.randint(1, 7)
+                layout.reflow(cpl)
+
+
+def test_delete_reports_touched_rows():
+    layout = LayoutIndex(list('ABCDE\nFG'), 3)
+    assert layout.delete(1, 'B') == (0, 1)      # line keeps its two rows
+    assert layout.delete(4, '\n') == (1, None)  # lines joined, later rows moved
+
+
+def test_join_and_split_keep_later_rows_when_the_row_count_holds():
+    layout = LayoutIndex(list('AB\nCD\nEF\nGH'), 3)
+    assert layout.delete(2, '\n') == (0, 1)         # two 1-row lines -> one 2-row line
+    assert layout.replace(1, 'B', '\n') == (0, 1)   # and split back
+    assert layout.rows == 4
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from yautjaglyphs import NEWLINE_MASK, encode_masks
+from yautjalayout import LayoutIndex
+from yautjaminimap import PALETTE, PATCH_ROWS, Minimap, _level, glyph_levels
+
+
+def reference_pixels(masks, layout, width):
+    pixels = bytearray(3 * width * layout.rows)
+    for row, lo, hi in layout.iter_rows(0, layout.rows - 1):
+        for x, i in enumerate(range(lo, hi)):
+            o = 3 * (row * width + x)
+            pixels[o:o+3] = bytes(PALETTE[_level(masks[i])])
+    return pixels
+
+
+def test_glyph_levels_match_per_glyph_levels():
+    rng = random.Random(29)
+    masks = encode_masks('YAUTJA\n')
+    masks.extend(rng.getrandbits(16) for _ in range(500))
+    masks.extend([0, 0xFFFF, NEWLINE_MASK])
+    assert list(glyph_levels(masks)) == [_level(m) for m in masks]
+
+
+@pytest.mark.parametrize('text', [
+    'SHORT\nA MUCH LONGER LINE THAT WRAPS TWICE\n\n\nEND',
+    'ENDS WITH A NEWLINE\n',
+    '',
+])
+def test_attach_matches_row_by_row_layout(text):
+    masks = encode_masks(text)
+    layout = LayoutIndex(list(text), 8)
+    minimap = Minimap()
+    minimap.attach(masks, layout)
+    assert minimap.pixels == reference_pixels(masks, layout, minimap.width)
+
+
+def test_edits_match_fresh_minimap():
+    rng = random.Random(290)
+    content = list('AB\nCDEFGHIJ\n\nKLMNOPQ\nRS\n' * 8)
+    masks = encode_masks(''.join(content))
+    layout = LayoutIndex(content, 5)
+    minimap = Minimap()
+    minimap.attach(masks, layout)
+    for _ in range(200):
+        i = rng.randrange(1, len(content))
+        if rng.random() < 0.5:
+            rows = layout.delete(i - 1, content[i - 1])
+            content.pop(i - 1)
+            masks.pop(i - 1)
+            minimap.invalidate_rows(*rows)
+        else:
+            new = rng.choice('X\n')
+            rows = layout.replace(i, content[i], new)
+            content[i] = new
+            masks[i] = encode_masks(new)[0]
+            minimap.invalidate_rows(*rows)
+        assert len(minimap.dirty_rows) <= PATCH_ROWS
+        minimap.clear_dirty()
+        fresh = Minimap()
+        fresh.attach(masks, layout)
+        assert (minimap.height, minimap.pixels) == (fresh.height, fresh.pixels)
+    # too many rows to patch one by one: the view reloads the image instead
+    minimap.invalidate_rows(0, minimap.height - 1)
+    assert minimap.resized and not minimap.dirty_rows
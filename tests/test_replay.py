@@ -0,0 +1,82 @@
+import yautjatabletv3
+from yautjareplay import Recorder, Report, StubRoot, StubWidget, _Event, headless, load_trace, play, replay
+
+
+class Scrollbar(StubWidget):
+    def config(self, command=None, **kwargs):
+        self.command = command
+
+
+def record(path):
+    """Drive a headless app through Recorder's own bindings."""
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=None)
+        app.load_content('YAUTJA TABLET\n' * 300)
+        bindings = {}
+        for widget in (app.root, app.canvas, app.minimap_canvas):
+            widget.bind = lambda sequence, handler, w=widget: bindings.__setitem__((w, sequence), handler)
+        app.hbar, app.vbar = Scrollbar(), Scrollbar()
+        recorder = Recorder(app, str(path))
+        key = bindings[app.root, '<Key>']
+        for char in 'ABC':
+            key(_Event(char=char, keysym=char))
+        bindings[app.root, '<BackSpace>'](_Event())
+        app.vbar.command('moveto', '0.5')
+        assert app.canvas.first == 0.5
+        app.vbar.command('scroll', '-2', 'units')
+        assert app.canvas.first < 0.5
+        bindings[app.canvas, '<Button-1>'](_Event(x=60, y=40))
+        recorder.close()
+
+
+def test_recorded_trace_replays(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    record(path)
+    events = load_trace(path)
+    assert events[0]['type'] == 'document'
+    scrolls = [ev for ev in events if ev['type'] == 'scroll']
+    assert [ev['args'] for ev in scrolls] == [['moveto', '0.5'], ['scroll', '-2', 'units']]
+
+    report = replay(events, repeat=2)
+    counts = {row['event']: row['count'] for row in report.summary()}
+    assert counts == {'key': 6, 'backspace': 2, 'scroll': 4, 'click': 2}
+    assert report.over_budget(budget_ms=5000) == []
+    assert 'key' in report.over_budget(budget_ops=0)
+
+
+def tabs(app):
+    return [(doc.name, doc.text if doc.compacted else ''.join(doc.content), doc.masks.tolist())
+            for doc in app.workspace.docs]
+
+
+def test_trace_follows_tab_changes(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=None)
+        app.load_content('FIRST')
+        app.open_text('second.txt', 'SECOND')
+        app.switch_to(app.workspace.docs[0])      # recording starts on the first of two tabs
+        keys = {}
+        app.root.bind = keys.__setitem__
+        recorder = Recorder(app, str(path))
+        key = keys['<Key>']
+        app.open_text('third.txt', 'THIRD')
+        key(_Event(char='x', keysym='x'))
+        app.switch_to(app.workspace.docs[1])
+        key(_Event(char='y', keysym='y'))
+        app.close_tab()                           # switches to another tab itself
+        key(_Event(char='z', keysym='z'))
+        app.compare_with('patterns.txt', b'1' * 16 + b'\n')
+        expected, marks = tabs(app), app.diff_marks
+        recorder.close()
+
+    events = load_trace(path)
+    assert [ev['type'] for ev in events] == ['document', 'document', 'document', 'open', 'key',
+                                             'switch', 'key', 'close_tab', 'key', 'compare']
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=None)
+        play(app, events, Report())
+        assert tabs(app)[1:] == expected[1:]      # the replay's first tab keeps its own name
+        assert tabs(app)[0][1:] == expected[0][1:]
+        assert app.diff_marks == marks
+        app.on_close()
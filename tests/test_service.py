@@ -0,0 +1,71 @@
+import asyncio
+
+from yautjaglyphs import encode_masks, format_patterns
+from yautjaservice import TranslationService
+
+
+async def http(port, method, path, body=b'', raw=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw if raw is not None else
+                 f'{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n'
+                 f'Connection: close\r\n\r\n'.encode() + body)
+    data = await reader.read()
+    writer.close()
+    head, _, payload = data.partition(b'\r\n\r\n')
+    status = int(head.split()[1]) if head else None
+    headers = dict(line.split(': ', 1) for line in head.decode('latin-1').split('\r\n')[1:])
+    return status, headers, payload
+
+
+def run(coro_fn, **opts):
+    async def main():
+        service = await TranslationService(**opts).start('127.0.0.1', 0)
+        try:
+            return await coro_fn(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+def test_encode_decode_round_trip():
+    async def check(service):
+        text = 'HELLO 123\nYAUTJA ~'
+        status, headers, patterns = await http(service.port, 'POST', '/encode', text.encode())
+        assert status == 200
+        assert headers['X-Unmapped'] == '1'
+        assert patterns.decode() == format_patterns(encode_masks(text))
+        status, _, decoded = await http(service.port, 'POST', '/decode', patterns)
+        assert status == 200
+        assert decoded.decode() == 'HELLO 123\nYAUTJA  '   # unmapped '~' was drawn blank
+        assert (await http(service.port, 'GET', '/health'))[0] == 200
+    run(check)
+
+
+def test_concurrent_requests_are_batched():
+    async def check(service):
+        texts = [f'TEXT {i}' for i in range(50)]
+        results = await asyncio.gather(*(service.encode(t) for t in texts))
+        assert [masks for masks, _ in results] == [encode_masks(t) for t in texts]
+        assert service.encoder.batches < len(texts)
+    run(check, batch_window=0.01)
+
+
+def test_full_queue_answers_503():
+    async def check(service):
+        replies = await asyncio.gather(*(http(service.port, 'POST', '/encode', b'ABC') for _ in range(8)))
+        statuses = [status for status, _, _ in replies]
+        assert 503 in statuses and 200 in statuses
+        busy = next(headers for status, headers, _ in replies if status == 503)
+        assert busy['Retry-After'] == '1'
+    # one slot, and the batcher sits on each request for 0.2 s
+    run(check, queue_size=1, put_timeout=0.01, batch_window=0.2, max_batch=1)
+
+
+def test_malformed_requests_get_400():
+    async def check(service):
+        assert (await http(service.port, 'POST', '/render?cols=abc', b'AB'))[0] == 400
+        assert (await http(service.port, None, None, raw=b'GARBAGE\r\n\r\n'))[0] == 400
+        bad_length = b'POST /encode HTTP/1.1\r\nContent-Length: lots\r\n\r\n'
+        assert (await http(service.port, None, None, raw=bad_length))[0] == 400
+        assert (await http(service.port, 'POST', '/decode', b'0101\n'))[0] == 400
+    run(check)
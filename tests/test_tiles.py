@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from yautjaglyphs import char_to_mask, encode_masks
+from yautjalayout import LayoutIndex
+from yautjatiles import TileRenderer
+
+
+@pytest.fixture
+def renderers():
+    made = []
+    def make(masks, layout, workers=0):
+        r = TileRenderer(workers=workers)
+        r.attach(masks, layout)
+        made.append(r)
+        return r
+    yield make
+    for r in made:
+        r.close()
+
+
+def all_keys(renderer, scale=0.25):
+    tiles_x, tiles_y = renderer.grid()
+    return [(tx, ty, scale) for ty in range(tiles_y) for tx in range(tiles_x)]
+
+
+def test_edits_match_fresh_renderer(renderers):
+    rng = random.Random(3)
+    text = 'ABCDEFGHIJ\n' + 'KLMNOPQRST\n' * 20
+    content = list(text)
+    masks = encode_masks(text)
+    layout = LayoutIndex(content, 20)
+    tiles = renderers(masks, layout)
+    tiles.render(all_keys(tiles))
+    for _ in range(40):
+        i = rng.randrange(1, len(content))
+        op = rng.random()
+        # the same calls yautjatabletv3 makes for each kind of edit
+        if op < 0.4:
+            rows = layout.delete(i - 1, content[i - 1])
+            content.pop(i - 1)
+            masks.pop(i - 1)
+            tiles.invalidate_rows(*rows)
+        elif op < 0.7:
+            new = rng.choice('XY')   # typing never produces a newline
+            rows = layout.replace(i, content[i], new)
+            old, content[i] = content[i], new
+            masks[i] = char_to_mask(new)
+            if old == '\n':
+                tiles.invalidate_rows(*rows)
+            else:
+                tiles.invalidate_glyph(i)
+        elif not content[i] == '\n':
+            masks[i] ^= 1 << rng.randrange(16)
+            tiles.invalidate_glyph(i)
+        assert list(tiles._shared.view[:len(masks)]) == list(masks)
+        keys = all_keys(tiles)
+        fresh = renderers(masks, layout)
+        assert tiles.render(keys) == fresh.render(keys)
+        fresh.close()
+
+
+def test_pool_render_matches_in_process(renderers):
+    text = 'YAUTJA 0123456789\n' * 12
+    masks = encode_masks(text)
+    layout = LayoutIndex(list(text), 16)
+    pooled = renderers(masks, layout, workers=2)
+    local = renderers(masks, layout)
+    keys = all_keys(pooled)
+    assert len(keys) > 1
+    assert pooled.render(keys) == local.render(keys)
@@ -0,0 +1,110 @@
+import pytest
+
+import yautjatabletv3
+from yautjaglyphs import encode_masks
+from yautjareplay import StubRoot, _Event, headless
+from yautjatiles import TileRenderer
+from yautjaworkspace import Workspace
+
+
+@pytest.fixture
+def app():
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=None)
+        app.tiles.workers = 0
+        yield app
+        app.on_close()
+
+
+def tiles_of(app, scale=0.25):
+    tiles_x, tiles_y = app.tiles.grid()
+    keys = [(tx, ty, scale) for ty in range(tiles_y) for tx in range(tiles_x)]
+    fresh = TileRenderer(workers=0)
+    fresh.attach(app.masks, app.layout)
+    try:
+        assert app.tiles.render(keys) == fresh.render(keys)
+    finally:
+        fresh.close()
+    return keys
+
+
+def test_switching_back_reuses_tiles(app):
+    first = app.doc
+    app.load_content('FIRST TAB\n' * 40)
+    keys = tiles_of(app)
+    block = app.tiles._shared.name
+    second = app.workspace.new('second')
+    app.switch_to(second)
+    app.load_content('SECOND\n' * 10)
+    tiles_of(app)
+
+    app.switch_to(first)
+    assert app.tiles._shared.name == block
+    rendered = app.tiles.rendered
+    app.tiles.render(keys)
+    assert app.tiles.rendered == rendered
+
+    app.on_key(_Event(char='X', keysym='X'))
+    tiles_of(app)
+    assert app.tiles.rendered == rendered + 1
+
+    # a hidden tab reflowed to a new width must not come back with old tiles
+    app.switch_to(second)
+    app.on_configure(_Event(width=600, height=600))
+    app.switch_to(first)
+    tiles_of(app)
+
+    app.close_tab()
+    assert app.doc is second
+    assert not any(key[0] is first for key in app.tiles.cache)
+
+
+def test_typing_after_closing_the_last_tab(app):
+    app.close_tab()
+    assert app.content == [] and len(app.workspace.docs) == 1
+    app.on_key(_Event(char='a', keysym='a'))
+    for handler in (app.on_left, app.on_right, app.on_up, app.on_down, app.on_backspace):
+        handler(_Event())
+    assert app.content == []
+
+
+def filled(workspace, name, text):
+    doc = workspace.new(name)
+    doc.content.extend(text)
+    doc.masks = encode_masks(text)
+    doc.layout.rebuild(doc.content)
+    return doc
+
+
+def test_evict_compacts_least_recently_used_first():
+    text = 'YAUTJA TABLET\n' * 200
+    workspace = Workspace(20)
+    a, b = filled(workspace, 'a', text), filled(workspace, 'b', text)
+    size = a.nbytes()
+    workspace.budget = 2 * size + size // 2   # room for two expanded tabs
+    assert workspace.activate(a) == [] and workspace.activate(b) == []
+    c = filled(workspace, 'c', text)
+    assert workspace.activate(c) == [a]
+    assert workspace.activate(a) == [b]       # a expanded again, b is now the oldest
+    assert a.content is not None and b.compacted and not c.compacted
+
+    # a hidden tab's render caches count against the budget and go with compaction
+    c.tile_bytes = 10 * size
+    assert workspace.activate(b) == [c]
+    assert c.tile_bytes == 0 and workspace.nbytes() <= workspace.budget
+
+
+def test_compacted_tabs_release_their_tiles():
+    with headless():
+        app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=None, budget=1)
+        app.tiles.workers = 0
+        first = app.doc
+        app.load_content('FIRST TAB\n' * 40)
+        tiles_of(app)
+        app.switch_to(app.workspace.new('second'))
+        assert first.compacted
+        assert first not in app.tiles._docs
+        assert not any(key[0] is first for key in app.tiles.cache)
+        app.switch_to(first)
+        tiles_of(app)
+        app.on_close()
@@ -0,0 +1,132 @@
+"""
+Yautja pattern diff
+- Compares two pattern documents (patterns.txt format) glyph by glyph
+- Each file becomes fixed-width records (yautjaglyphs.pattern_records), so
+  glyph i sits at the same offset in both files
+- Equal blocks of records are skipped with one slice comparison; differing
+  blocks are decoded to packed masks column by column and XORed in bulk
+- Python objects are only built for the glyphs that differ
+- Reports changed glyph indices, flipped segments and old/new characters
+
+Usage:
+    python yautjadiff.py old_patterns.txt new_patterns.txt [--limit 50]
+"""
+
+import argparse
+import sys
+from array import array
+from itertools import compress
+
+from yautjaglyphs import PATTERN_RECORD, decode_records, mask_to_ascii, pattern_records
+
+BLOCK = 16384   # glyphs compared / decoded at once
+
+
+class PatternDiff:
+    def __init__(self, old_count, new_count, changed, old_masks, new_masks):
+        self.old_count = old_count
+        self.new_count = new_count
+        self.changed = changed       # array('L') of glyph indices
+        self.old_masks = old_masks   # array('I'), 0 past the end of a side
+        self.new_masks = new_masks
+
+    def __len__(self):
+        return len(self.changed)
+
+    def flipped(self, k):
+        """Segment numbers that differ for the k-th changed glyph."""
+        x = (self.old_masks[k] ^ self.new_masks[k]) & 0xFFFF
+        return [s for s in range(16) if x >> s & 1]
+
+    def chars(self, k):
+        """(old, new) decoded characters; None where a side has no glyph."""
+        i = self.changed[k]
+        old = mask_to_ascii.get(self.old_masks[k], '?') if i < self.old_count else None
+        new = mask_to_ascii.get(self.new_masks[k], '?') if i < self.new_count else None
+        return old, new
+
+    def __iter__(self):
+        for k, i in enumerate(self.changed):
+            old, new = self.chars(k)
+            yield i, self.flipped(k), old, new
+
+
+def _collect(diff, first, old, new):
+    """Record the glyphs where equal-length mask arrays differ (``first`` = index of old[0])."""
+    n = len(old)
+    x = (int.from_bytes(old.tobytes(), 'little') ^ int.from_bytes(new.tobytes(), 'little')).to_bytes(4 * n, 'little')
+    flags = 0
+    for p in range(4):
+        flags |= int.from_bytes(x[p::4], 'little')
+    flags = flags.to_bytes(n, 'little')   # nonzero where the glyph changed
+    if 0 not in flags:
+        diff.changed.extend(range(first, first + n))
+        diff.old_masks.extend(old)
+        diff.new_masks.extend(new)
+        return
+    diff.changed.extend(compress(range(first, first + n), flags))
+    diff.old_masks.extend(compress(old, flags))
+    diff.new_masks.extend(compress(new, flags))
+
+def _collect_tail(diff, first, masks):
+    """Glyphs from ``first`` on that only the longer side has."""
+    longer, other = (diff.old_masks, diff.new_masks) if diff.old_count > diff.new_count else (diff.new_masks, diff.old_masks)
+    diff.changed.extend(range(first, first + len(masks)))
+    longer.extend(masks)
+    other.extend(bytes(len(masks)))
+
+def diff_masks(old, new):
+    """Diff two packed mask arrays."""
+    diff = PatternDiff(len(old), len(new), array('L'), array('I'), array('I'))
+    common = min(len(old), len(new))
+    for lo in range(0, common, BLOCK):
+        hi = min(lo + BLOCK, common)
+        if old[lo:hi] != new[lo:hi]:
+            _collect(diff, lo, old[lo:hi], new[lo:hi])
+    _collect_tail(diff, common, (old if len(old) > len(new) else new)[common:])
+    return diff
+
+def diff_bytes(old, new):
+    """Diff two patterns.txt buffers; only blocks that differ are decoded."""
+    old, new = pattern_records(old), pattern_records(new)
+    diff = PatternDiff(len(old) // PATTERN_RECORD, len(new) // PATTERN_RECORD, array('L'), array('I'), array('I'))
+    common = min(len(old), len(new))
+    step = BLOCK * PATTERN_RECORD
+    for o in range(0, common, step):
+        end = min(o + step, common)
+        a, b = old[o:end], new[o:end]
+        if a != b:
+            first = o // PATTERN_RECORD
+            _collect(diff, first, decode_records(a, first), decode_records(b, first))
+    longer = old if len(old) > len(new) else new
+    _collect_tail(diff, common // PATTERN_RECORD, decode_records(longer[common:], common // PATTERN_RECORD))
+    return diff
+
+def diff_files(old_path, new_path):
+    with open(old_path, 'rb') as f:
+        old = f.read()
+    with open(new_path, 'rb') as f:
+        new = f.read()
+    return diff_bytes(old, new)
+
+
+def _show(ch):
+    return '-' if ch is None else '⏎' if ch == '\n' else repr(ch)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare two Yautja pattern files')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--limit', type=int, default=50, help='differences to list (0 for all)')
+    args = parser.parse_args()
+    try:
+        d = diff_files(args.old, args.new)
+    except (OSError, ValueError) as e:
+        sys.exit(f'error: {e}')
+    print(f'{d.old_count} -> {d.new_count} glyphs, {len(d)} changed')
+    for n, (i, segs, old, new) in enumerate(d):
+        if args.limit and n >= args.limit:
+            print(f'... {len(d) - n} more')
+            break
+        print(f'{i:>10}  {_show(old):>5} -> {_show(new):<5} segments {segs}')
+    sys.exit(1 if len(d) else 0)
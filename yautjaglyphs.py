@@ -0,0 +1,255 @@
+"""
+Yautja glyph tables
+- 16-segment geometry and the ASCII <-> pattern tables shared by the tools
+- Packed masks: one int per glyph, bit s set when segment s is active,
+  NEWLINE_MASK for line breaks
+- Bulk encode (bytes.translate, no per-character Python) / decode and the
+  patterns.txt format
+- No tkinter dependency, so services and batch tools can import it
+"""
+
+import math
+import sys
+from array import array
+from functools import lru_cache
+
+# --- Config ---
+RADIUS = 22
+SPACING_X = 40
+SPACING_Y = 100
+
+# 16 direction vectors for segment drawing (normalized-ish)
+DIRECTIONS_16 = {
+    0:  (0, -0.72),
+    1:  (math.sqrt(2)/2, -math.sqrt(2)/2),
+    2:  (0.72, 0),
+    3:  (math.sqrt(2)/2, math.sqrt(2)/2),
+    4:  (0, 0.72),
+    5:  (-math.sqrt(2)/2, math.sqrt(2)/2),
+    6:  (-0.72, 0),
+    7:  (-math.sqrt(2)/2, -math.sqrt(2)/2),
+    8:  (0, -0.72),
+    9:  (math.sqrt(2)/2, -math.sqrt(2)/2),
+    10: (0.72, 0),
+    11: (math.sqrt(2)/2, math.sqrt(2)/2),
+    12: (0, 0.72),
+    13: (-math.sqrt(2)/2, math.sqrt(2)/2),
+    14: (-0.72, 0),
+    15: (-math.sqrt(2)/2, -math.sqrt(2)/2),
+}
+
+# --- Example mapping table (shortened) ---
+# digit_segments (0-9) + A..Z (some provided as examples)
+# Each entry is a list/tuple of 16 ints (0/1) representing segments
+BASE_SEGMENTS = [
+    (1,0,0,1,0,0,0,0,0,0,0,0,1,0,0,1),  # 0
+    (1,0,1,0,0,1,1,0,0,0,1,0,1,0,0,0),  # 1
+    (1,0,1,1,0,1,1,0,0,0,1,0,0,0,0,1),  # 2
+    (0,0,1,0,0,0,0,0,0,0,1,0,1,0,0,1),  # 3
+    (0,0,1,1,0,1,0,0,0,0,1,0,1,0,0,1),  # 4
+    (1,0,0,0,0,1,1,0,0,1,1,0,1,0,0,1),  # 5
+    (0,0,0,1,0,1,0,0,0,1,1,0,1,0,0,1),  # 6
+    (1,0,0,0,0,1,1,0,0,1,1,0,1,0,0,0),  # 7
+    (1,0,1,1,0,1,1,0,0,0,1,0,1,0,0,1),  # 8
+    (1,0,1,1,0,1,1,0,0,1,1,0,1,0,0,1),  # 9
+    (1,1,0,1,0,0,0,0,0,1,0,0,1,0,0,0),  # A index 10
+    (1,1,1,0,0,0,0,0,0,0,0,0,0,0,0,0),  # B index 11
+    (1,0,1,1,0,0,0,0,0,1,0,0,0,0,0,1),  # C index 12
+    (1,0,1,0,0,0,0,0,0,1,0,0,0,0,0,1),  # D index 13
+    (1,0,0,1,0,0,0,0,0,1,0,0,1,0,0,1),  # E index 13
+    (1,0,1,1,0,0,0,0,0,1,0,0,1,0,0,1),  # F index 14
+    (1,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0),  # G index 15
+    (1,0,0,1,0,0,0,0,0,1,0,0,1,0,0,0),  # H index 16
+    (0,0,0,1,0,0,0,0,0,1,0,0,1,0,0,1),  # I index 17
+    (1,1,0,0,0,0,0,0,0,1,0,0,1,0,0,1),  # J index 18
+    (1,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0),  # K index 19
+    (1,1,0,1,0,0,0,0,0,1,0,0,1,0,0,1),  # L index 20     
+    (1,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0),  # M index 21
+    (1,1,1,1,0,0,0,0,0,0,0,0,0,0,0,0),  # N index 22
+    (1,0,0,0,0,0,0,0,0,1,0,0,1,0,0,1),  # O index 23
+    (1,1,0,1,0,0,0,0,0,0,0,0,1,0,0,1),  # P index 24
+    (1,1,1,1,0,0,0,0,0,0,1,0,0,0,0,1),  # Q index 25
+    (1,1,1,1,0,0,0,0,0,0,0,0,1,0,0,0),  # R index 26
+    (0,1,1,1,0,0,0,0,0,0,1,0,0,0,0,1),  # S index 27
+    (0,0,1,1,0,0,0,0,0,0,0,0,1,0,0,1),  # T index 28
+    (1,0,1,0,0,0,0,0,0,0,0,0,1,0,0,0),  # U index 29   
+    (1,1,1,1,0,0,0,0,0,1,0,0,1,0,0,0),  # V index 30
+    (1,1,0,1,0,0,0,0,0,0,0,0,0,0,0,1),  # W index 31
+    (0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,1),  # X index 32
+    (0,0,1,1,0,0,0,0,0,1,0,0,0,0,0,1),  # Y index 33
+    (1,1,1,1,0,0,0,0,0,1,0,0,1,0,0,1),  # Z index 34
+    (0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0),  #   index 35 (space)
+]
+
+# build ascii_map from BASE_SEGMENTS
+ascii_to_segments = {}
+segments_to_ascii = {}
+# map digits
+for i in range(10):
+    ascii_to_segments[str(i)] = BASE_SEGMENTS[i]
+    segments_to_ascii[tuple(BASE_SEGMENTS[i])] = str(i)
+# map some letters (A-D)
+letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z',' ']
+for idx, ch in enumerate(letters, start=10):
+    if idx < len(BASE_SEGMENTS):
+        seg = BASE_SEGMENTS[idx]
+        ascii_to_segments[ch] = seg
+        segments_to_ascii[tuple(seg)] = ch
+
+# Helper: create an empty 16-bit pattern
+def empty_pattern():
+    return [0]*16
+
+# Convert a pattern (list of ints) to a printable key
+def pattern_key(pattern):
+    return tuple(int(bool(x)) for x in pattern)
+
+# Segment end points for a glyph drawn at (off_x, off_y)
+def segment_line(seg_index, off_x, off_y):
+    dx, dy = DIRECTIONS_16[seg_index]
+    offset_y = 1 if seg_index < 8 else RADIUS + 8
+    return (off_x, off_y + offset_y,
+            off_x + dx*RADIUS, off_y + dy*RADIUS + offset_y)
+
+# --- Packed masks ---
+NEWLINE_MASK = 1 << 16
+
+def pattern_to_mask(pattern):
+    if pattern is None:
+        return NEWLINE_MASK
+    mask = 0
+    for s, active in enumerate(pattern):
+        if active:
+            mask |= 1 << s
+    return mask
+
+def mask_to_pattern(mask):
+    if mask & NEWLINE_MASK:
+        return None
+    return [(mask >> s) & 1 for s in range(16)]
+
+mask_to_ascii = {pattern_to_mask(seg): ch for seg, ch in segments_to_ascii.items()}
+mask_to_ascii[NEWLINE_MASK] = '\n'
+
+# --- Bulk encoding ---
+# text bytes -> glyph index (BASE_SEGMENTS order) with one bytes.translate,
+# then glyph index -> mask bytes with one translate per byte of the mask
+NEWLINE_GLYPH = len(BASE_SEGMENTS)
+UNMAPPED_GLYPH = NEWLINE_GLYPH + 1
+MASK_BY_GLYPH = [pattern_to_mask(seg) for seg in BASE_SEGMENTS] + [NEWLINE_MASK, 0]
+
+_glyph_index = bytearray([UNMAPPED_GLYPH]) * 256
+for idx, seg in enumerate(BASE_SEGMENTS):
+    ch = segments_to_ascii[tuple(seg)]
+    _glyph_index[ord(ch)] = _glyph_index[ord(ch.lower())] = idx
+_glyph_index[ord('\n')] = NEWLINE_GLYPH
+GLYPH_INDEX = bytes(_glyph_index)
+
+_MASK_PLANES = [bytes((m >> shift) & 0xFF for m in MASK_BY_GLYPH).ljust(256, b'\0')
+                for shift in (0, 8, 16, 24)]
+if sys.byteorder == 'big':
+    _MASK_PLANES.reverse()
+
+def glyph_indices(text):
+    """Case-folded glyph index per character ('\\r' dropped), as bytes."""
+    return text.encode('ascii', 'replace').translate(GLYPH_INDEX, b'\r')
+
+def gather_masks(indices):
+    """array('I') of masks for a bytes-like of glyph indices."""
+    buf = bytearray(4 * len(indices))
+    for offset, plane in enumerate(_MASK_PLANES):
+        buf[offset::4] = indices.translate(plane)
+    masks = array('I')
+    masks.frombytes(buf)
+    return masks
+
+def bulk_encode(text):
+    """Encode text to masks; returns (masks, unmapped character count).
+
+    Unmapped characters (anything but 0-9, A-Z, space and newline, in
+    either case) become blank glyphs.
+    """
+    indices = glyph_indices(text)
+    return gather_masks(indices), indices.count(UNMAPPED_GLYPH)
+
+def encode_masks(text):
+    return bulk_encode(text)[0]
+
+def char_to_mask(ch):
+    return MASK_BY_GLYPH[GLYPH_INDEX[ord(ch)]] if ord(ch) < 128 else 0
+
+def decode_masks(masks):
+    """Translate masks back to ASCII; unknown patterns become '?'."""
+    get = mask_to_ascii.get
+    return ''.join([get(m, '?') for m in masks])
+
+# --- patterns.txt format: one 16-char 0/1 line per glyph, blank line for newline ---
+@lru_cache(maxsize=None)
+def _pattern_line(mask):
+    if mask & NEWLINE_MASK:
+        return '\n'
+    return format(mask, '016b')[::-1] + '\n'
+
+def format_patterns(masks):
+    return ''.join(map(_pattern_line, masks))
+
+PATTERN_RECORD = 17          # bytes per patterns.txt line once blank lines are expanded
+_BLANK = b'-' * 16           # stands in for a newline glyph's blank line
+_PATTERN_BYTES = b'01\n' + _BLANK[:1]
+_COLUMN_BITS = [bytes(1 << c % 8 if i == ord('1') else 0 for i in range(256)) for c in range(16)]
+_IS_BLANK = bytes(int(i == _BLANK[0]) for i in range(256))
+
+def _pattern_mask(line, n):
+    """Mask for patterns.txt line number ``n`` (without its '\\n')."""
+    if not line:
+        return NEWLINE_MASK
+    if len(line) != 16 or line.strip(b'01'):
+        raise ValueError(f'line {n}: expected 16 segment bits, got {line.decode("latin-1")!r}')
+    return int(line[::-1], 2)
+
+def pattern_records(data):
+    """patterns.txt bytes as PATTERN_RECORD-byte lines, so glyph i starts at
+    byte PATTERN_RECORD*i; ValueError names the first malformed line."""
+    data = data.replace(b'\r', b'')
+    if data and not data.endswith(b'\n'):
+        data += b'\n'
+    if _BLANK[:1] not in data:
+        records = _BLANK + data if data.startswith(b'\n') else data
+        blank = b'\n' + _BLANK + b'\n'
+        for _ in range(2):   # runs of blank lines come out of one pass half expanded
+            records = records.replace(b'\n\n', blank)
+            n = len(records) // PATTERN_RECORD
+            if (len(records) == n * PATTERN_RECORD and records.count(b'\n') == n
+                    and not records[PATTERN_RECORD-1::PATTERN_RECORD].strip(b'\n')):
+                return records
+    # some line has the wrong length (or contains _BLANK's filler): report it
+    for n, line in enumerate(data.split(b'\n')[:-1], start=1):
+        _pattern_mask(line, n)
+    raise ValueError('malformed patterns file')
+
+def decode_records(records, first=0):
+    """array('I') of masks for whole records; ``first`` is the glyph number of the first."""
+    if records.translate(None, _PATTERN_BYTES):
+        for o in range(0, len(records), PATTERN_RECORD):
+            if records[o] != _BLANK[0]:
+                _pattern_mask(records[o:o + PATTERN_RECORD - 1], first + o // PATTERN_RECORD + 1)
+    n = len(records) // PATTERN_RECORD
+    # column c is segment c and lands in byte c // 8 of the mask; the bits are
+    # disjoint, so summing the columns as big integers never carries between glyphs
+    buf = bytearray(4 * n)
+    for byte in (0, 1):
+        total = sum(int.from_bytes(records[c::PATTERN_RECORD].translate(_COLUMN_BITS[c]), 'little')
+                    for c in range(8 * byte, 8 * byte + 8))
+        buf[byte::4] = total.to_bytes(n, 'little')
+    buf[2::4] = records[0::PATTERN_RECORD].translate(_IS_BLANK)   # NEWLINE_MASK is bit 16
+    masks = array('I')
+    masks.frombytes(buf)
+    if sys.byteorder != 'little':
+        masks.byteswap()
+    return masks
+
+def parse_patterns(data):
+    """Masks for a patterns.txt document (bytes, or str), no per-line Python."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return decode_records(pattern_records(data))
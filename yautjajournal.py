@@ -0,0 +1,322 @@
+"""
+Yautja autosave journal
+- Every edit is appended as one small fixed-size binary record (set / delete)
+- Records are buffered in memory; a background thread writes and fsyncs
+  them every COMMIT_INTERVAL seconds (group commit), not once per edit
+- A snapshot holds the whole document; recovery loads the newest complete
+  snapshot and replays the journals written after it
+- Past COMPACT_BYTES the journal is folded into a fresh snapshot: a
+  background thread replays it onto the previous snapshot (as recovery
+  would) while new edits already go to the next journal, so the editor
+  never copies the document
+
+Files in the autosave directory, N = generation:
+    snapshot.N   document at the start of journal.N
+    journal.N    edits made since snapshot.N
+"""
+
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+
+# --- Config ---
+AUTOSAVE_DIR = '.yautja-autosave'
+COMMIT_INTERVAL = 0.5    # seconds between group commits
+COMPACT_BYTES = 4 << 20  # journal size that triggers a new snapshot
+
+OP_SET = 1      # masks[index] = mask; content[index] = chr(codepoint) unless 0
+OP_DELETE = 2   # del content[index], masks[index]
+
+RECORD = struct.Struct('<BIII')           # op, index, mask, codepoint
+CRC = struct.Struct('<I')
+RECORD_SIZE = RECORD.size + CRC.size
+SNAPSHOT_MAGIC = b'YJS1'
+SNAPSHOT_HEADER = struct.Struct('<4sII')  # magic, glyph count, utf-8 text length
+
+
+def _record(op, index, mask=0, codepoint=0):
+    body = RECORD.pack(op, index, mask, codepoint)
+    return body + CRC.pack(zlib.crc32(body))
+
+def _le_bytes(masks):
+    if sys.byteorder == 'little':
+        return masks.tobytes()
+    swapped = array('I', masks)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+# --- snapshots ---
+def write_snapshot(path, text, mask_bytes):
+    """Write a snapshot atomically: temp file, fsync, rename, fsync the directory."""
+    data = text.encode('utf-8')
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(mask_bytes) // 4, len(data))
+    crc = zlib.crc32(mask_bytes, zlib.crc32(data, zlib.crc32(header)))
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(data)
+        f.write(mask_bytes)
+        f.write(CRC.pack(crc))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path))
+
+def read_snapshot(path):
+    """(content list, masks) from a snapshot, or None if it is missing or damaged."""
+    try:
+        with open(path, 'rb') as f:
+            blob = f.read()
+    except OSError:
+        return None
+    if len(blob) < SNAPSHOT_HEADER.size + CRC.size:
+        return None
+    magic, count, text_len = SNAPSHOT_HEADER.unpack_from(blob)
+    end = SNAPSHOT_HEADER.size + text_len + 4 * count
+    if magic != SNAPSHOT_MAGIC or len(blob) != end + CRC.size:
+        return None
+    if zlib.crc32(memoryview(blob)[:end]) != CRC.unpack_from(blob, end)[0]:
+        return None
+    content = list(blob[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + text_len].decode('utf-8'))
+    masks = array('I', blob[end - 4 * count:end])
+    if sys.byteorder != 'little':
+        masks.byteswap()
+    if len(content) != len(masks):
+        return None
+    return content, masks
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return   # not supported on this platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# --- journal replay ---
+def replay_journal(path, content, masks):
+    """Apply the records in ``path`` in place; returns how many were applied.
+
+    Stops at the first torn or damaged record (the tail of an interrupted write).
+    """
+    try:
+        with open(path, 'rb') as f:
+            blob = f.read()
+    except OSError:
+        return 0
+    applied = 0
+    for o in range(0, len(blob) - RECORD_SIZE + 1, RECORD_SIZE):
+        body = blob[o:o + RECORD.size]
+        if zlib.crc32(body) != CRC.unpack_from(blob, o + RECORD.size)[0]:
+            break
+        op, index, mask, codepoint = RECORD.unpack(body)
+        if index >= len(masks):
+            break
+        if op == OP_SET:
+            masks[index] = mask
+            if codepoint:
+                content[index] = chr(codepoint)
+        elif op == OP_DELETE:
+            del content[index]
+            masks.pop(index)
+        else:
+            break
+        applied += 1
+    return applied
+
+def _generations(directory, prefix):
+    gens = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return gens
+    for name in names:
+        head, _, tail = name.partition('.')
+        if head == prefix and tail.isdigit():
+            gens.append(int(tail))
+    return sorted(gens)
+
+
+class Journal:
+    """Autosave journal for one document in ``directory``.
+
+    Call reset() with the document after loading it, log_set()/log_delete()
+    for each edit, and compact() when ``wants_compaction`` turns true.
+    Failures on the background threads are left in ``error``.
+    """
+
+    def __init__(self, directory=AUTOSAVE_DIR, interval=COMMIT_INTERVAL, compact_bytes=COMPACT_BYTES):
+        self.directory = directory
+        self.interval = interval
+        self.compact_bytes = compact_bytes
+        os.makedirs(directory, exist_ok=True)
+        gens = _generations(directory, 'snapshot') + _generations(directory, 'journal')
+        self.generation = max(gens, default=0)
+        self.size = 0        # bytes committed to the current journal
+        self.commits = 0
+        self.error = None    # last OSError from the commit or compaction thread
+        self._pending = bytearray()
+        self._lock = threading.Lock()   # guards _pending
+        self._io = threading.Lock()     # guards the journal file
+        self._file = None
+        self._compactor = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='yautja-journal', daemon=True)
+        self._thread.start()
+
+    def _path(self, kind, generation):
+        return os.path.join(self.directory, f'{kind}.{generation}')
+
+    # --- recovery ---
+    def recover(self, before=None):
+        """(content list, masks, edits replayed) from the autosave files, or None.
+
+        ``before`` limits recovery to the files of earlier generations.
+        """
+        for gen in reversed(_generations(self.directory, 'snapshot')):
+            if before is not None and gen >= before:
+                continue
+            state = read_snapshot(self._path('snapshot', gen))
+            if state is not None:
+                break
+        else:
+            return None
+        content, masks = state
+        edits = 0
+        for j in _generations(self.directory, 'journal'):
+            if j >= gen and (before is None or j < before):
+                edits += replay_journal(self._path('journal', j), content, masks)
+        return content, masks, edits
+
+    # --- logging (Tk thread) ---
+    def log_set(self, index, mask, char=None):
+        """Glyph ``index`` now has ``mask`` (and ``char``, if the text changed)."""
+        with self._lock:
+            self._pending += _record(OP_SET, index, mask, ord(char) if char else 0)
+
+    def log_delete(self, index):
+        with self._lock:
+            self._pending += _record(OP_DELETE, index)
+
+    @property
+    def wants_compaction(self):
+        return self.size + len(self._pending) > self.compact_bytes and not self.compacting
+
+    @property
+    def compacting(self):
+        return self._compactor is not None and self._compactor.is_alive()
+
+    # --- group commit ---
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.commit()
+            except OSError as e:
+                self.error = e
+
+    def commit(self):
+        """Write and fsync everything logged so far."""
+        with self._io:
+            self._commit_locked()
+
+    def _commit_locked(self):
+        with self._lock:
+            if self._file is None or not self._pending:
+                return
+            data, self._pending = bytes(self._pending), bytearray()
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.size += len(data)
+        self.commits += 1
+
+    def _next_journal(self):
+        # caller holds self._io
+        if self._file is not None:
+            self._file.close()
+        self.generation += 1
+        self._file = open(self._path('journal', self.generation), 'ab')
+        self.size = 0
+
+    # --- snapshots ---
+    def compact(self):
+        """Start a new journal and fold the older files into a snapshot in the background.
+
+        Only the pending records are written here; the document is rebuilt
+        from the last snapshot and journals on the compaction thread.
+        """
+        if self.compacting:
+            return
+        with self._io:
+            self._commit_locked()
+            self._next_journal()
+        self._compactor = threading.Thread(target=self._fold, name='yautja-compact',
+                                           args=(self.generation,), daemon=True)
+        self._compactor.start()
+
+    def reset(self, content, masks):
+        """Make ``content``/``masks`` the new base document (after a load), synchronously."""
+        self.wait()
+        with self._lock:
+            self._pending = bytearray()   # edits to the previous document
+        with self._io:
+            self._next_journal()
+        self._write_snapshot(self.generation, ''.join(content), _le_bytes(masks))
+
+    def wait(self):
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def _fold(self, generation):
+        state = self.recover(before=generation)
+        if state is None:
+            self.error = OSError(f'no snapshot to compact in {self.directory}')
+            return
+        content, masks, _ = state
+        self._write_snapshot(generation, ''.join(content), _le_bytes(masks))
+
+    def _write_snapshot(self, generation, text, mask_bytes):
+        try:
+            write_snapshot(self._path('snapshot', generation), text, mask_bytes)
+        except OSError as e:
+            self.error = e
+            return
+        # everything older is covered by the new snapshot
+        for kind in ('snapshot', 'journal'):
+            for gen in _generations(self.directory, kind):
+                if gen < generation:
+                    try:
+                        os.remove(self._path(kind, gen))
+                    except OSError:
+                        pass
+
+    def close(self, discard=False):
+        """Stop the commit thread; ``discard`` removes the autosave files (clean exit)."""
+        self._stop.set()
+        self._thread.join()
+        self.wait()
+        with self._io:
+            if discard:
+                with self._lock:
+                    self._pending = bytearray()
+            self._commit_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if discard:
+            for name in os.listdir(self.directory):
+                head, _, tail = name.partition('.')
+                if head in ('snapshot', 'journal'):
+                    os.remove(os.path.join(self.directory, name))
+            try:
+                os.rmdir(self.directory)
+            except OSError:
+                pass
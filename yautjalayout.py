@@ -0,0 +1,286 @@
+"""
+Yautja Tablet layout index
+- Maps logical lines (split after each '\\n') to glyph offsets
+- Maps visual rows (logical lines wrapped at chars_per_line) to glyph positions
+- Lines are kept in blocks of about BLOCK_LINES; Fenwick trees over the
+  block sums give O(log n + BLOCK_LINES) position / row lookups
+- Edits only re-layout the logical lines they touch; splitting or joining
+  a line changes one block (re-indexing the blocks is O(lines / BLOCK_LINES)
+  and only happens when a block overflows or empties)
+- Edits return the visual rows they touched; the range is open-ended only
+  when the row count changed and every later row moved
+"""
+
+BLOCK_LINES = 64   # a block splits once it holds twice this many lines
+
+
+class _Fenwick:
+    """Prefix sums over a list of non-negative ints."""
+
+    def __init__(self, values):
+        n = len(values)
+        tree = [0] * (n + 1)
+        for i, v in enumerate(values, start=1):
+            tree[i] += v
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._n = n
+        self._tree = tree
+        self._top = 1 << n.bit_length() if n else 0
+        self.total = sum(values)
+
+    def add(self, i, delta):
+        self.total += delta
+        i += 1
+        while i <= self._n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        # sum of values[0:i]
+        s = 0
+        while i > 0:
+            s += self._tree[i]
+            i -= i & -i
+        return s
+
+    def search(self, target):
+        # index of the bucket that contains position ``target``
+        pos = 0
+        bit = self._top
+        while bit:
+            nxt = pos + bit
+            if nxt <= self._n and self._tree[nxt] <= target:
+                pos = nxt
+                target -= self._tree[nxt]
+            bit >>= 1
+        return pos
+
+
+class LayoutIndex:
+    """Newline-aware glyph layout for a list of characters.
+
+    Every logical line owns its trailing '\\n' glyph (drawn as a return
+    marker), and takes ``max(1, ceil(len / chars_per_line))`` visual rows.
+    Edit methods return ``(first_row, last_row)`` of the rows that need
+    re-laying out; ``last_row`` is None when every row after ``first_row``
+    moved.
+    """
+
+    def __init__(self, content, chars_per_line):
+        self.chars_per_line = max(1, int(chars_per_line))
+        self.rebuild(content)
+
+    # --- build ---
+    def rebuild(self, content):
+        parts = ''.join(content).split('\n')
+        lengths = [len(p) + 1 for p in parts[:-1]]
+        lengths.append(len(parts[-1]))
+        self._lengths = [lengths[i:i + BLOCK_LINES] for i in range(0, len(lengths), BLOCK_LINES)]
+        self._rows = [[self._rows_for(n) for n in block] for block in self._lengths]
+        self._reindex()
+
+    def _reindex(self):
+        # Fenwick trees over the per-block sums: O(blocks)
+        self._len_tree = _Fenwick([sum(b) for b in self._lengths])
+        self._row_tree = _Fenwick([sum(b) for b in self._rows])
+        self._line_tree = _Fenwick([len(b) for b in self._lengths])
+
+    def _rows_for(self, length):
+        return max(1, -(-length // self.chars_per_line))
+
+    def reflow(self, chars_per_line):
+        """Re-wrap every line at a new width. Returns True if it changed."""
+        chars_per_line = max(1, int(chars_per_line))
+        if chars_per_line == self.chars_per_line:
+            return False
+        self.chars_per_line = chars_per_line
+        self._rows = [[self._rows_for(n) for n in block] for block in self._lengths]
+        self._row_tree = _Fenwick([sum(b) for b in self._rows])
+        return True
+
+    # --- block lookups ---
+    def _find(self, index):
+        # (block, line in block, first glyph of that line), clamped to the last line
+        b = min(self._len_tree.search(index), len(self._lengths) - 1)
+        start = self._len_tree.prefix(b)
+        block = self._lengths[b]
+        for k, n in enumerate(block):
+            if index < start + n:
+                return b, k, start
+            start += n
+        return b, len(block) - 1, start - block[-1]
+
+    def _block_of_line(self, line):
+        b = min(self._line_tree.search(line), len(self._lengths) - 1)
+        return b, line - self._line_tree.prefix(b)
+
+    def _first_row(self, b, k):
+        return self._row_tree.prefix(b) + sum(self._rows[b][:k])
+
+    def _last_row(self, index):
+        # last visual row of the line holding glyph ``index``
+        b, k, _ = self._find(index)
+        return self._first_row(b, k) + self._rows[b][k] - 1
+
+    def _set_line(self, b, k, length):
+        delta = length - self._lengths[b][k]
+        rows = self._rows_for(length)
+        self._lengths[b][k] = length
+        self._len_tree.add(b, delta)
+        self._row_tree.add(b, rows - self._rows[b][k])
+        self._rows[b][k] = rows
+
+    def _insert_line(self, b, k, length):
+        rows = self._rows_for(length)
+        self._lengths[b].insert(k, length)
+        self._rows[b].insert(k, rows)
+        if len(self._lengths[b]) > 2 * BLOCK_LINES:
+            for blocks in (self._lengths, self._rows):
+                block = blocks[b]
+                blocks[b:b + 1] = [block[:BLOCK_LINES], block[BLOCK_LINES:]]
+            self._reindex()
+        else:
+            self._len_tree.add(b, length)
+            self._row_tree.add(b, rows)
+            self._line_tree.add(b, 1)
+
+    def _remove_line(self, b, k):
+        length = self._lengths[b].pop(k)
+        rows = self._rows[b].pop(k)
+        if not self._lengths[b]:
+            del self._lengths[b], self._rows[b]
+            self._reindex()
+        else:
+            self._len_tree.add(b, -length)
+            self._row_tree.add(b, -rows)
+            self._line_tree.add(b, -1)
+        return length
+
+    def _next_line(self, b, k):
+        # (block, line in block) after (b, k), or None for the last line
+        if k + 1 < len(self._lengths[b]):
+            return b, k + 1
+        if b + 1 < len(self._lengths):
+            return b + 1, 0
+        return None
+
+    # --- queries ---
+    @property
+    def rows(self):
+        return self._row_tree.total
+
+    @property
+    def lines(self):
+        return self._line_tree.total
+
+    def __len__(self):
+        return self._len_tree.total
+
+    def nbytes(self):
+        """Rough memory held by the index: two per-line lists of ints."""
+        return (16 + 2 * 28) * self.lines + 2 * 64 * len(self._lengths)
+
+    def line_of(self, index):
+        b, k, _ = self._find(index)
+        return self._line_tree.prefix(b) + k
+
+    def line_start(self, line):
+        b, k = self._block_of_line(line)
+        return self._len_tree.prefix(b) + sum(self._lengths[b][:k])
+
+    def position(self, index):
+        """Visual (row, col) of glyph ``index``."""
+        b, k, start = self._find(index)
+        off = index - start
+        row = self._first_row(b, k) + off // self.chars_per_line
+        return row, off % self.chars_per_line
+
+    def row_range(self, row):
+        """Glyph index range [start, end) drawn on visual ``row``."""
+        row = max(0, min(row, self.rows - 1))
+        b = min(self._row_tree.search(row), len(self._rows) - 1)
+        first = self._row_tree.prefix(b)
+        start = self._len_tree.prefix(b)
+        for k, rows in enumerate(self._rows[b]):
+            if row < first + rows:
+                break
+            first += rows
+            start += self._lengths[b][k]
+        length = self._lengths[b][k]
+        lo = min((row - first) * self.chars_per_line, length)
+        hi = min(lo + self.chars_per_line, length)
+        return start + lo, start + hi
+
+    def index_at(self, row, col):
+        """Nearest glyph index to visual (row, col), clamped to the row."""
+        start, end = self.row_range(row)
+        if end <= start:
+            return start
+        return start + max(0, min(col, end - start - 1))
+
+    def iter_rows(self, first_row=0, last_row=None):
+        """Yield (row, start, end) for visual rows first_row..last_row."""
+        total_rows = self.rows
+        last_row = total_rows - 1 if last_row is None else min(last_row, total_rows - 1)
+        first_row = max(0, first_row)
+        if first_row > last_row:
+            return
+        cpl = self.chars_per_line
+        b = self._row_tree.search(first_row)
+        row = self._row_tree.prefix(b)
+        start = self._len_tree.prefix(b)
+        while b < len(self._lengths):
+            for length, rows in zip(self._lengths[b], self._rows[b]):
+                if row > last_row:
+                    return
+                if row + rows > first_row:
+                    for sub in range(rows):
+                        if first_row <= row <= last_row:
+                            lo = min(sub * cpl, length)
+                            yield row, start + lo, start + min(lo + cpl, length)
+                        row += 1
+                else:
+                    row += rows
+                start += length
+            b += 1
+
+    # --- edits ---
+    def replace(self, index, old, new):
+        """Glyph ``index`` changed from character ``old`` to ``new``."""
+        row, _ = self.position(index)
+        if (old == '\n') == (new == '\n'):
+            return row, row
+        rows = self.rows
+        b, k, start = self._find(index)
+        if old == '\n':
+            # newline overwritten: join with the following line
+            nxt = self._next_line(b, k)
+            if nxt is not None:
+                self._set_line(b, k, self._lengths[b][k] + self._remove_line(*nxt))
+        else:
+            # character became a newline: split the line after it
+            cut = index - start + 1
+            rest = self._lengths[b][k] - cut
+            self._set_line(b, k, cut)
+            self._insert_line(b, k + 1, rest)
+        if self.rows != rows:
+            return row, None
+        # same row count: nothing below the joined / split lines moved
+        return row, self._last_row(index if old == '\n' else index + 1)
+
+    def delete(self, index, ch):
+        """Glyph ``index`` (character ``ch``) was removed."""
+        b, k, _ = self._find(index)
+        row, _ = self.position(index)
+        nxt = self._next_line(b, k)
+        if ch == '\n' and nxt is not None:
+            rows = self.rows
+            self._set_line(b, k, self._lengths[b][k] - 1 + self._remove_line(*nxt))
+            return row, None if self.rows != rows else self._last_row(index)
+        rows = self._rows[b][k]
+        self._set_line(b, k, self._lengths[b][k] - 1)
+        if self._rows[b][k] != rows:
+            return row, None
+        return row, self._first_row(b, k) + rows - 1
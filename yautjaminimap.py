@@ -0,0 +1,178 @@
+"""
+Yautja minimap
+- One pixel per glyph, laid out like the tablet, colored by the number of
+  active segments (newlines in gray, empty cells black)
+- Built in one pass over the packed masks with bytes.translate lookups
+- Edits patch single pixels or the re-laid-out rows instead of rebuilding;
+  past PATCH_ROWS dirty rows the view reloads the whole image instead
+- Same attach / invalidate_glyph / invalidate_rows API as TileRenderer
+"""
+
+import sys
+
+from yautjaglyphs import NEWLINE_MASK
+
+# --- Config ---
+MINIMAP_SCALE = 3    # screen pixels per glyph
+NEWLINE_LEVEL = 17
+EMPTY_LEVEL = 255    # cells right of a line's end (palette black)
+PATCH_ROWS = 32      # more dirty rows than this: reload the image, don't patch rows
+
+def _level_color(level):
+    if level == NEWLINE_LEVEL:
+        return (0x60, 0x60, 0x60)
+    if level == 0:
+        return (0x28, 0x10, 0x10)
+    return (min(255, 80 + level * 11), level * 4, 0)
+
+PALETTE = [_level_color(level) for level in range(NEWLINE_LEVEL + 1)]
+_PAL_R = bytes(c[0] for c in PALETTE).ljust(256, b'\0')
+_PAL_G = bytes(c[1] for c in PALETTE).ljust(256, b'\0')
+_PAL_B = bytes(c[2] for c in PALETTE).ljust(256, b'\0')
+_POPCOUNT = bytes(bin(i).count('1') for i in range(256))
+_NEWLINE = bytes([0] + [NEWLINE_LEVEL] * 255)
+_NL = bytes([NEWLINE_LEVEL])
+# byte offsets of mask bits 0-7, 8-15 and 16-23 inside a native uint32
+_PLANES = (0, 1, 2) if sys.byteorder == 'little' else (3, 2, 1)
+
+
+def glyph_levels(masks):
+    """Active-segment count per glyph (NEWLINE_LEVEL for newlines), as bytes."""
+    data = memoryview(masks).tobytes()
+    lo, hi, nl = (data[p::4] for p in _PLANES)
+    # per-byte sums stay below 256 (8 + 8 + NEWLINE_LEVEL), so adding the
+    # planes as big integers never carries from one glyph into the next
+    total = sum(int.from_bytes(plane, 'little') for plane in
+                (lo.translate(_POPCOUNT), hi.translate(_POPCOUNT), nl.translate(_NEWLINE)))
+    return total.to_bytes(len(lo), 'little')
+
+def levels_to_rgb(levels):
+    rgb = bytearray(3 * len(levels))
+    rgb[0::3] = levels.translate(_PAL_R)
+    rgb[1::3] = levels.translate(_PAL_G)
+    rgb[2::3] = levels.translate(_PAL_B)
+    return rgb
+
+def _level(mask):
+    if mask & NEWLINE_MASK:
+        return NEWLINE_LEVEL
+    return bin(mask & 0xFFFF).count('1')
+
+
+class Minimap:
+    def __init__(self):
+        self.masks = None
+        self.layout = None
+        self.width = self.height = 0
+        self.pixels = bytearray()
+        self.dirty_pixels = []   # (x, y) patched since the view last drew
+        self.dirty_rows = set()
+        self.resized = True      # the view must reload the whole image
+
+    # --- build ---
+    def attach(self, masks, layout, state=None):
+        """Bind a document; ``state`` from state() is reused if the geometry still matches."""
+        self.masks = masks
+        self.layout = layout
+        self.width = layout.chars_per_line
+        self.height = layout.rows
+        if state is not None and state[:2] == (self.width, self.height):
+            self.pixels = state[2]
+        else:
+            self.pixels = bytearray(3 * self.width * self.height)
+            self._blit_rows(0, self.height - 1)
+        self.resized = True
+
+    def state(self):
+        """(width, height, pixels) to hand back to attach() when the document returns."""
+        return self.width, self.height, self.pixels
+
+    def _blit_rows(self, first_row, last_row):
+        start = self.layout.row_range(first_row)[0]
+        end = self.layout.row_range(last_row)[1]
+        levels = glyph_levels(self.masks[start:end])
+        # pad every line out to whole rows, then color the grid in one pass
+        w = self.width
+        fill = bytes([EMPTY_LEVEL]) * w
+        lines = levels.split(_NL)
+        tail = lines.pop()
+        grid = b''.join([line + _NL + fill[:(-len(line) - 1) % w] for line in lines])
+        grid += tail + fill[:-len(tail) % w]
+        size = (last_row - first_row + 1) * w
+        if len(grid) == size or len(grid) == size - w:   # a final empty line is one blank row
+            o = 3 * first_row * w
+            self.pixels[o:o + 3*size] = levels_to_rgb(grid.ljust(size, fill[:1]))
+            return
+        # masks and layout disagree about the newlines: lay out row by row
+        rgb = levels_to_rgb(levels)
+        stride = 3 * w
+        for row, lo, hi in self.layout.iter_rows(first_row, last_row):
+            o = row * stride
+            n = 3 * (hi - lo)
+            self.pixels[o:o+n] = rgb[3*(lo-start):3*(hi-start)]
+            self.pixels[o+n:o+stride] = bytes(stride - n)
+
+    # --- patching ---
+    def invalidate_all(self):
+        self.attach(self.masks, self.layout)
+
+    def invalidate_glyph(self, index):
+        """Glyph ``index`` changed in place."""
+        y, x = self.layout.position(index)
+        o = 3 * (y * self.width + x)
+        self.pixels[o:o+3] = bytes(PALETTE[_level(self.masks[index])])
+        self.dirty_pixels.append((x, y))
+
+    def _lines_end(self, row):
+        # last row of the line drawn on ``row`` and of the line after it
+        start = self.layout.row_range(row)[0]
+        nxt = self.layout.line_of(start) + 2
+        if nxt >= self.layout.lines:
+            return self.layout.rows - 1
+        return self.layout.position(self.layout.line_start(nxt) - 1)[0]
+
+    def invalidate_rows(self, first_row, last_row=None):
+        """Rows first_row..last_row were re-laid out (None: through the end)."""
+        rows = self.layout.rows
+        if last_row is None and rows != self.height:
+            # a join / split only re-lays out its own lines; every row below
+            # them just moved, so shift those pixels instead of redrawing them
+            stride = 3 * self.width
+            last_row = self._lines_end(first_row)
+            keep = (last_row + 1) * stride
+            moved = self.pixels[keep - (rows - self.height) * stride:]
+            del self.pixels[keep:]
+            self.pixels.extend(bytes(keep - len(self.pixels)))
+            self.pixels += moved
+            self.height = rows
+            self.resized = True
+        elif rows != self.height:
+            size = 3 * self.width * rows
+            del self.pixels[size:]
+            self.pixels.extend(bytes(size - len(self.pixels)))
+            self.height = rows
+            self.resized = True
+        last_row = rows - 1 if last_row is None else min(last_row, rows - 1)
+        first_row = min(first_row, last_row)
+        self._blit_rows(first_row, last_row)
+        if self.resized or len(self.dirty_rows) + last_row - first_row >= PATCH_ROWS:
+            self.resized = True
+            self.dirty_rows.clear()
+        else:
+            self.dirty_rows.update(range(first_row, last_row + 1))
+
+    # --- view helpers ---
+    def clear_dirty(self):
+        self.dirty_pixels = []
+        self.dirty_rows = set()
+        self.resized = False
+
+    def color(self, x, y):
+        o = 3 * (y * self.width + x)
+        return '#%02x%02x%02x' % tuple(self.pixels[o:o+3])
+
+    def row_colors(self, y):
+        return [self.color(x, y) for x in range(self.width)]
+
+    def ppm(self):
+        return b'P6 %d %d 255\n' % (self.width, self.height) + bytes(self.pixels)
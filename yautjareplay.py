@@ -0,0 +1,378 @@
+"""
+Yautja input recording and headless replay
+- Recorder hooks a running YautjaTablet and appends every key, click,
+  scroll, resize and blink event to a JSON-lines trace
+- The trace starts with every open tab; tab switches, loads, closes and
+  compares are events too, so later input replays against the same document
+- replay() feeds a trace into a YautjaTablet built on stand-in widgets
+  (no display needed) and times each handler and counts its canvas calls
+- With budgets, a trace becomes a repeatable latency regression test
+
+Usage:
+    python yautjatabletv3.py --record lag.jsonl
+    python yautjareplay.py lag.jsonl --repeat 5 --budget-ms 20
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import sys
+import time
+import types
+from array import array
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+import yautjatabletv3
+
+ARROWS = {'left': 'on_left', 'right': 'on_right', 'up': 'on_up', 'down': 'on_down'}
+
+
+class _Event:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+# --- recording ---
+class Recorder:
+    """Rebinds the app's handlers so each event is logged before it runs."""
+
+    def __init__(self, app, path):
+        self.app = app
+        self.file = open(path, 'w', encoding='utf-8')
+        self.start = time.perf_counter()
+        docs = app.workspace.docs
+        for doc in docs:
+            self._write({'type': 'document', **document_state(app, doc)})
+        if app.doc is not docs[-1]:
+            self._write({'type': 'document', 'tab': docs.index(app.doc)})
+
+        root, canvas = app.root, app.canvas
+        root.bind('<Key>', self._wrap('key', app.on_key, lambda e: {'char': e.char, 'keysym': e.keysym}))
+        root.bind('<BackSpace>', self._wrap('backspace', app.on_backspace))
+        for kind, name in ARROWS.items():
+            root.bind(f'<{kind.capitalize()}>', self._wrap(kind, getattr(app, name)))
+        canvas.bind('<Button-1>', self._wrap('click', app.on_click, self._canvas_xy(canvas)))
+        canvas.bind('<Configure>', self._wrap('configure', app.on_configure,
+                                              lambda e: {'width': e.width, 'height': e.height}))
+        app.minimap_canvas.bind('<Button-1>', self._wrap('minimap_click', app.on_minimap_click,
+                                                         self._canvas_xy(app.minimap_canvas)))
+        app.hbar.config(command=self._wrap_scroll('x', canvas.xview))
+        app.vbar.config(command=self._wrap_scroll('y', canvas.yview))
+        # blink_cursor reschedules itself through the attribute, so this sticks
+        app.blink_cursor = self._wrap('blink', app.blink_cursor)
+        # tab buttons and load / compare go through these attributes; Close Tab was bound directly
+        self._in_tab_op = False
+        app.switch_to = self._wrap_tab('switch', app.switch_to, lambda doc: {'tab': app.workspace.docs.index(doc)})
+        app.open_text = self._wrap_tab('open', app.open_text, lambda name, text: {'name': name, 'text': text})
+        app.close_tab = self._wrap_tab('close_tab', app.close_tab)
+        app.compare_with = self._wrap_tab('compare', app.compare_with,
+                                          lambda name, data: {'name': name, 'patterns': data.decode('latin-1')})
+        app.close_btn.config(command=app.close_tab)
+        root.protocol('WM_DELETE_WINDOW', self.close)
+
+    @staticmethod
+    def _canvas_xy(canvas):
+        # canvas coordinates, so replay does not depend on the scroll position
+        return lambda e: {'x': canvas.canvasx(e.x), 'y': canvas.canvasy(e.y)}
+
+    def _write(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def _wrap(self, kind, handler, fields=None):
+        def recorded(*args):
+            record = {'type': kind, 't': round(time.perf_counter() - self.start, 6)}
+            if fields is not None:
+                record.update(fields(*args))
+            t0 = time.perf_counter()
+            result = handler(*args)
+            record['ms'] = round((time.perf_counter() - t0) * 1000, 3)
+            self._write(record)
+            return result
+        return recorded
+
+    def _wrap_scroll(self, axis, view):
+        # scrollbar commands arrive as ('moveto', f) or ('scroll', n, 'units')
+        # the tuple is kept whole for the record; the view gets it unpacked
+        scroll = self._wrap('scroll', lambda args: view(*args),
+                            lambda args: {'axis': axis, 'args': list(args)})
+        return lambda *args: scroll(args)
+
+    def _wrap_tab(self, kind, handler, fields=None):
+        # close_tab and open_text switch tabs themselves; record only the outermost call
+        recorded = self._wrap(kind, handler, fields)
+        def call(*args):
+            if self._in_tab_op:
+                return handler(*args)
+            self._in_tab_op = True
+            try:
+                return recorded(*args)
+            finally:
+                self._in_tab_op = False
+        return call
+
+    def close(self):
+        self.file.close()
+        self.app.on_close()
+
+
+def document_state(app, doc=None):
+    doc = doc or app.doc
+    return {
+        'tab': app.workspace.docs.index(doc),
+        'name': doc.name,
+        'text': doc.text if doc.compacted else ''.join(doc.content),
+        'masks': base64.b64encode(doc.masks.tobytes()).decode('ascii'),
+        'byteorder': sys.byteorder,
+        'cursor': doc.cursor_index,
+        'width': 100 + 2 * app.chars_per_line * yautjatabletv3.SPACING_X,
+    }
+
+
+# --- stand-in widgets ---
+class StubWidget:
+    """Accepts any widget call and does nothing."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StubRoot(StubWidget):
+    def after(self, ms, callback=None, *args):
+        # blinks come from the trace, not from a timer
+        return None
+
+
+class StubPhoto(StubWidget):
+    def zoom(self, *args):
+        return self
+
+
+class StubCanvas:
+    """Canvas stand-in that counts calls and keeps line geometry for hit tests."""
+
+    def __init__(self, *args, **kwargs):
+        self.ops = Counter()
+        self.lines = {}
+        self.ids = itertools.count(1)
+        self.scrollregion = (0, 0, 0, 0)
+        self.height = int(kwargs.get('height', 600))
+        self.yscrollcommand = None
+        self.first = 0.0
+
+    def __getattr__(self, name):
+        def op(*args, **kwargs):
+            self.ops[name] += 1
+            if name.startswith('create_'):
+                return next(self.ids)
+            return None
+        return op
+
+    def create_line(self, x1, y1, x2, y2, **kwargs):
+        self.ops['create_line'] += 1
+        item = next(self.ids)
+        self.lines[item] = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        return item
+
+    def delete(self, *items):
+        self.ops['delete'] += 1
+        if 'all' in items:
+            self.lines.clear()
+        for item in items:
+            self.lines.pop(item, None)
+
+    def find_overlapping(self, x1, y1, x2, y2):
+        self.ops['find_overlapping'] += 1
+        return tuple(item for item, (a, b, c, d) in self.lines.items()
+                     if a <= x2 and c >= x1 and b <= y2 and d >= y1)
+
+    def canvasx(self, x):
+        return x
+
+    def canvasy(self, y):
+        # window -> canvas coordinates for the current vertical scroll
+        return y + self.first * self.scrollregion[3]
+
+    def winfo_height(self):
+        return self.height
+
+    def config(self, **kwargs):
+        self.ops['config'] += 1
+        self.scrollregion = kwargs.get('scrollregion', self.scrollregion)
+        self.yscrollcommand = kwargs.get('yscrollcommand', self.yscrollcommand)
+
+    configure = config
+
+    def yview(self, *args):
+        self.ops['yview'] += 1
+        total = max(1, self.scrollregion[3])
+        if args and args[0] == 'moveto':
+            self.first = float(args[1])
+        elif args and args[0] == 'scroll':
+            step = 0.1 * self.height if args[2] == 'units' else self.height
+            self.first += int(args[1]) * step / total
+        self.first = max(0.0, min(self.first, 1.0))
+        if self.yscrollcommand:
+            self.yscrollcommand(self.first, min(1.0, self.first + self.height / total))
+
+    def yview_moveto(self, fraction):
+        self.yview('moveto', fraction)
+
+    @property
+    def total_ops(self):
+        return sum(self.ops.values())
+
+
+STUB_TK = types.SimpleNamespace(
+    Tk=StubRoot, Frame=StubWidget, Button=StubWidget, Label=StubWidget,
+    Scrollbar=StubWidget, Toplevel=StubWidget, Canvas=StubCanvas, PhotoImage=StubPhoto,
+)
+
+@contextmanager
+def headless():
+    """Point yautjatabletv3 at the stand-in widgets for the duration."""
+    real = yautjatabletv3.tk, yautjatabletv3.messagebox
+    yautjatabletv3.tk, yautjatabletv3.messagebox = STUB_TK, StubWidget()
+    try:
+        yield
+    finally:
+        yautjatabletv3.tk, yautjatabletv3.messagebox = real
+
+
+# --- replay ---
+def load_trace(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _apply_document(app, doc):
+    # 'tab' one past the last opens a new tab; a record without text only switches
+    docs = app.workspace.docs
+    tab = doc.get('tab', 0)
+    app.switch_to(docs[tab] if tab < len(docs) else app.workspace.new(doc['name']))
+    if 'text' not in doc:
+        return
+    app.on_configure(_Event(width=doc['width'], height=600))
+    app.load_content(doc['text'])
+    masks = array('I', base64.b64decode(doc['masks']))
+    if doc.get('byteorder', sys.byteorder) != sys.byteorder:
+        masks.byteswap()
+    if masks != app.masks:
+        app.masks[:] = masks
+        app.tiles.invalidate_all()
+        app.minimap.invalidate_all()
+    app.cursor_index = doc['cursor']
+
+def _dispatch(app, ev):
+    kind = ev['type']
+    if kind == 'key':
+        app.on_key(_Event(char=ev['char'], keysym=ev.get('keysym', '')))
+    elif kind == 'backspace':
+        app.on_backspace(_Event())
+    elif kind in ARROWS:
+        getattr(app, ARROWS[kind])(_Event())
+    elif kind == 'click':
+        # traces hold canvas coordinates; handlers expect window coordinates
+        app.on_click(_Event(x=ev['x'], y=ev['y'] - app.canvas.canvasy(0)))
+    elif kind == 'minimap_click':
+        app.on_minimap_click(_Event(x=ev['x'], y=ev['y'] - app.minimap_canvas.canvasy(0)))
+    elif kind == 'scroll':
+        canvas = app.canvas
+        (canvas.yview if ev['axis'] == 'y' else canvas.xview)(*ev['args'])
+    elif kind == 'configure':
+        app.on_configure(_Event(width=ev['width'], height=ev['height']))
+    elif kind == 'blink':
+        app.blink_cursor()
+    elif kind == 'switch':
+        app.switch_to(app.workspace.docs[ev['tab']])
+    elif kind == 'open':
+        app.open_text(ev['name'], ev['text'])
+    elif kind == 'close_tab':
+        app.close_tab()
+    elif kind == 'compare':
+        app.compare_with(ev['name'], ev['patterns'].encode('latin-1'))
+    else:
+        raise ValueError(f'unknown event type {kind!r}')
+
+
+class Report:
+    def __init__(self):
+        self.samples = defaultdict(list)   # kind -> [(ms, canvas ops)]
+
+    def add(self, kind, ms, ops):
+        self.samples[kind].append((ms, ops))
+
+    @staticmethod
+    def _pct(values, p):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+    def summary(self):
+        rows = []
+        for kind, samples in sorted(self.samples.items()):
+            ms = [s[0] for s in samples]
+            ops = [s[1] for s in samples]
+            rows.append({'event': kind, 'count': len(samples), 'mean_ms': sum(ms) / len(ms),
+                         'p50_ms': self._pct(ms, 50), 'p95_ms': self._pct(ms, 95), 'max_ms': max(ms),
+                         'mean_ops': sum(ops) / len(ops), 'max_ops': max(ops)})
+        return rows
+
+    def format(self):
+        lines = [f"{'event':<14}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'ops':>9}{'max ops':>9}"]
+        for r in self.summary():
+            lines.append(f"{r['event']:<14}{r['count']:>7}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}"
+                         f"{r['p95_ms']:>10.3f}{r['max_ms']:>10.3f}{r['mean_ops']:>9.0f}{r['max_ops']:>9}")
+        return '\n'.join(lines)
+
+    def over_budget(self, budget_ms=None, budget_ops=None):
+        """Event kinds whose p95 time or max canvas ops exceed the budget."""
+        return [r['event'] for r in self.summary()
+                if (budget_ms is not None and r['p95_ms'] > budget_ms)
+                or (budget_ops is not None and r['max_ops'] > budget_ops)]
+
+
+def play(app, events, report):
+    """Feed ``events`` to ``app``, timing everything but the document records."""
+    canvases = (app.canvas, app.minimap_canvas)
+    for ev in events:
+        if ev['type'] == 'document':
+            _apply_document(app, ev)
+            continue
+        ops0 = sum(c.total_ops for c in canvases)
+        t0 = time.perf_counter()
+        _dispatch(app, ev)
+        ms = (time.perf_counter() - t0) * 1000
+        report.add(ev['type'], ms, sum(c.total_ops for c in canvases) - ops0)
+    return report
+
+
+def replay(events, repeat=1, report=None):
+    """Run ``events`` against fresh headless apps ``repeat`` times."""
+    report = report or Report()
+    for _ in range(repeat):
+        with headless():
+            app = yautjatabletv3.YautjaTablet(StubRoot(), autosave=None)
+            try:
+                play(app, events, report)
+            finally:
+                app.on_close()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a recorded Yautja Tablet trace headlessly')
+    parser.add_argument('trace')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--budget-ms', type=float, help='fail if any event p95 exceeds this')
+    parser.add_argument('--budget-ops', type=int, help='fail if any event issues more canvas calls')
+    args = parser.parse_args()
+    report = replay(load_trace(args.trace), args.repeat)
+    print(report.format())
+    slow = report.over_budget(args.budget_ms, args.budget_ops)
+    if slow:
+        print('over budget: ' + ', '.join(slow))
+        sys.exit(1)
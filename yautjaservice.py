@@ -0,0 +1,287 @@
+"""
+Yautja translation service
+- Small asyncio HTTP server (TCP or Unix socket) over the glyph tables
+- POST /encode   text            -> patterns.txt lines (X-Unmapped: count)
+- POST /decode   patterns.txt    -> text
+- POST /render   text (?cols=N)  -> SVG image
+- GET  /health
+- Concurrent requests are micro-batched into one table lookup per batch
+- Bounded queues: a full queue answers 503 instead of piling up work
+
+Usage:
+    python yautjaservice.py --port 8765
+    python yautjaservice.py --unix /tmp/yautja.sock
+    curl --data-binary @input.txt http://127.0.0.1:8765/encode
+"""
+
+import argparse
+import asyncio
+from array import array
+from urllib.parse import urlsplit, parse_qs
+
+from yautjaglyphs import (
+    SPACING_X, SPACING_Y, NEWLINE_MASK,
+    UNMAPPED_GLYPH, glyph_indices, gather_masks,
+    decode_masks, format_patterns, parse_patterns, segment_line,
+)
+from yautjalayout import LayoutIndex
+
+# --- Config ---
+MAX_BATCH = 256          # requests folded into one lookup
+BATCH_WINDOW = 0.002     # seconds to wait for more requests before a lookup
+QUEUE_SIZE = 1024        # pending requests per endpoint
+PUT_TIMEOUT = 0.5        # seconds a request may wait for queue space
+MAX_BODY = 1 << 20       # bytes
+
+
+class ServiceBusy(Exception):
+    """The request queue stayed full for longer than PUT_TIMEOUT."""
+
+
+class _Batcher:
+    """Collects submitted items and runs ``fn`` over a whole batch at once."""
+
+    def __init__(self, fn, max_batch=MAX_BATCH, window=BATCH_WINDOW,
+                 queue_size=QUEUE_SIZE, put_timeout=PUT_TIMEOUT):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.window = window
+        self.put_timeout = put_timeout
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.batches = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, item):
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self.queue.put((item, fut)), self.put_timeout)
+        except asyncio.TimeoutError:
+            raise ServiceBusy() from None
+        return await fut
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            if self.queue.empty() and self.window:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self.batches += 1
+            try:
+                results = self.fn([item for item, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+
+
+# --- batch functions: one lookup for the whole batch, then split ---
+def _encode_batch(texts):
+    indices = glyph_indices(''.join(texts))
+    masks = gather_masks(indices)
+    out, pos = [], 0
+    for t in texts:
+        end = pos + len(t)
+        out.append((masks[pos:end], indices.count(UNMAPPED_GLYPH, pos, end)))
+        pos = end
+    return out
+
+def _decode_batch(mask_arrays):
+    joined = array('I')
+    for m in mask_arrays:
+        joined.extend(m)
+    text = decode_masks(joined)
+    out, pos = [], 0
+    for m in mask_arrays:
+        out.append(text[pos:pos + len(m)])
+        pos += len(m)
+    return out
+
+
+def render_svg(masks, chars_per_line=20):
+    """SVG drawing of packed masks, laid out like the tablet canvas."""
+    text = ''.join(['\n' if m & NEWLINE_MASK else 'x' for m in masks])
+    layout = LayoutIndex(text, chars_per_line)
+    width = 100 + chars_per_line * SPACING_X
+    height = 120 + layout.rows * SPACING_Y
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">',
+        f'<rect width="{width}" height="{height}" fill="black"/>',
+        '<g stroke="red" stroke-width="3" stroke-linecap="round">',
+    ]
+    returns = []
+    for r, start, end in layout.iter_rows():
+        off_y = 60 + r * SPACING_Y
+        for i in range(start, end):
+            off_x = 50 + (i - start) * SPACING_X
+            mask = masks[i]
+            if mask & NEWLINE_MASK:
+                returns.append(f'<text x="{off_x+20}" y="{off_y}">⏎</text>')
+                continue
+            for s in range(16):
+                if mask >> s & 1:
+                    x1, y1, x2, y2 = segment_line(s, off_x, off_y)
+                    parts.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>')
+    parts.append('</g>')
+    if returns:
+        parts.append('<g fill="gray" font-family="Arial" font-size="20" text-anchor="middle">')
+        parts.extend(returns)
+        parts.append('</g>')
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+class TranslationService:
+    def __init__(self, max_batch=MAX_BATCH, batch_window=BATCH_WINDOW,
+                 queue_size=QUEUE_SIZE, put_timeout=PUT_TIMEOUT, max_body=MAX_BODY):
+        self.max_body = max_body
+        opts = dict(max_batch=max_batch, window=batch_window,
+                    queue_size=queue_size, put_timeout=put_timeout)
+        self.encoder = _Batcher(_encode_batch, **opts)
+        self.decoder = _Batcher(_decode_batch, **opts)
+        self.server = None
+        self.port = None
+
+    # --- lifecycle ---
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        self.encoder.start()
+        self.decoder.start()
+        if path:
+            self.server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        await self.encoder.stop()
+        await self.decoder.stop()
+
+    # --- API (also usable in-process) ---
+    async def encode(self, text):
+        """(masks, unmapped character count) for ``text``."""
+        return await self.encoder.submit(text.replace('\r', ''))
+
+    async def decode(self, masks):
+        return await self.decoder.submit(masks)
+
+    # --- HTTP ---
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    k, _, v = h.decode('latin-1').partition(':')
+                    headers[k.strip().lower()] = v.strip()
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, 'text/plain', b'malformed request\n', False)
+                    break
+                if length > self.max_body:
+                    await self._respond(writer, 413, 'text/plain', b'request too large\n', False)
+                    break
+                body = await reader.readexactly(length)
+                status, ctype, payload, extra = await self._dispatch(method, target, body)
+                keep = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, ctype, payload, keep, extra)
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        try:
+            if method == 'GET' and url.path == '/health':
+                return 200, 'text/plain', b'ok\n', {}
+            if method != 'POST':
+                return 405, 'text/plain', b'method not allowed\n', {}
+            if url.path == '/decode':
+                try:
+                    masks = parse_patterns(body)
+                except ValueError as e:
+                    return 400, 'text/plain', f'{e}\n'.encode(), {}
+                return 200, 'text/plain; charset=utf-8', (await self.decode(masks)).encode(), {}
+            text = body.decode('utf-8', errors='replace')
+            if url.path == '/encode':
+                masks, unmapped = await self.encode(text)
+                return 200, 'text/plain', format_patterns(masks).encode(), {'X-Unmapped': unmapped}
+            if url.path == '/render':
+                try:
+                    cols = int(parse_qs(url.query).get('cols', ['20'])[0])
+                except ValueError:
+                    return 400, 'text/plain', b'cols must be an integer\n', {}
+                masks, _ = await self.encode(text)
+                return 200, 'image/svg+xml', render_svg(masks, max(1, cols)).encode(), {}
+            return 404, 'text/plain', b'not found\n', {}
+        except ServiceBusy:
+            return 503, 'text/plain', b'busy, retry later\n', {'Retry-After': 1}
+
+    async def _respond(self, writer, status, ctype, payload, keep, extra=None):
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  413: 'Payload Too Large', 503: 'Service Unavailable'}[status]
+        head = [f'HTTP/1.1 {status} {reason}',
+                f'Content-Type: {ctype}',
+                f'Content-Length: {len(payload)}',
+                'Connection: ' + ('keep-alive' if keep else 'close')]
+        head += [f'{k}: {v}' for k, v in (extra or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        await writer.drain()
+
+
+async def serve(args):
+    service = TranslationService(max_batch=args.max_batch, batch_window=args.batch_ms / 1000,
+                                 queue_size=args.queue)
+    await service.start(args.host, args.port, args.unix)
+    where = args.unix or f'http://{args.host}:{service.port}'
+    print(f'Yautja translation service on {where}')
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Yautja encode/decode/render service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on a Unix socket path instead of TCP')
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--batch-ms', type=float, default=BATCH_WINDOW * 1000)
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
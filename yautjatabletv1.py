@@ -75,6 +75,13 @@ digit_segments = [
     (0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0),  #   index 35 (space)
 ]
 
+# byte -> index into digit_segments (0-9, then A-Z in either case);
+# everything else falls back to the 0 glyph
+GLYPH_INDEX = bytearray(256)
+for i, ch in enumerate('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+    GLYPH_INDEX[ord(ch)] = GLYPH_INDEX[ord(ch.lower())] = i
+GLYPH_INDEX = bytes(GLYPH_INDEX)
+
 # Function to draw a single segment of a character
 def draw_segment(canvas, i, center_x, center_y, color, width):
     dx, dy = DIRECTIONS_16[i]
@@ -121,21 +128,11 @@ def load_characters_from_file(file_path):
 # Function to draw the tablet display of characters
 def draw_yautja_tablet(canvas, content, offset_x=100, offset_y=100, spacing=SPACING):
     characters_per_line = 10  # Display up to 10 characters per line
-    for i, char in enumerate(content):
-        # Check if the character is a digit or a letter
-        if char.isdigit():  # Handling digits
-            segs = digit_segments[int(char)]
-        elif char.isalpha():  # Handling letters (A-Z)
-            # Map letters to their respective Yautja segment patterns
-            index = ord(char.upper()) - ord('A')  # Map A-Z to 0-25
-            if 0 <= index < len(digit_segments):
-                segs = digit_segments[index + 10]  # Adjust based on your offset
-            else:
-                segs = digit_segments[0]  # Default to 0 if letter mapping is missing
-        else:
-            # For non-alphanumeric characters, fallback to default (blank or placeholder)
-            segs = digit_segments[0]  # Default to 0 if no mapping exists
-        
+    # Map the whole text to glyph indices in one pass
+    indices = content.encode('ascii', 'replace').translate(GLYPH_INDEX)
+    for i, (char, glyph) in enumerate(zip(content, indices)):
+        segs = digit_segments[glyph]
+
         # Calculate the row and column of the character
         row = i // characters_per_line
         col = i % characters_per_line
@@ -4,108 +4,60 @@ Yautja Tablet v3
 - Arrow key navigation and backspace support
 - Changes to ASCII update Yautja characters immediately
 - Cursor blinks in ASCII text
+- Newline-aware layout that reflows to the window width
+- Tiled overview window and image export (rendered in a process pool)
+- Minimap beside the canvas; click it to jump
+- --record TRACE logs input events for headless replay (yautjareplay.py)
+- Compare against a saved patterns file; differing glyphs are outlined
+- Edits are journaled to an autosave directory and recovered after a crash
+- Tabs: several documents per window sharing the render caches; only the
+  visible rows of the active tab are drawn
 """
 
 
-import math
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
+from yautjaglyphs import (
+    SPACING_X, SPACING_Y, NEWLINE_MASK, mask_to_ascii, char_to_mask,
+    bulk_encode, decode_masks, format_patterns, parse_patterns, segment_line,
+)
+from yautjadiff import diff_masks
+from yautjajournal import AUTOSAVE_DIR
+from yautjaminimap import Minimap, MINIMAP_SCALE
+from yautjatiles import TileRenderer, tile_size
+from yautjaworkspace import Workspace, MEMORY_BUDGET
+
 # --- Config ---
-RADIUS = 22
-SPACING_X = 40
-SPACING_Y = 100
 CHARS_PER_LINE = 20
+OVERVIEW_SCALE = 0.5
+VIEW_MARGIN_ROWS = 2  # rows drawn above / below the visible ones
+
+
+class _DocField:
+    """Attribute stored on the active document, so handlers keep using self.content etc."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, app, owner=None):
+        return self if app is None else getattr(app.doc, self.name)
+
+    def __set__(self, app, value):
+        setattr(app.doc, self.name, value)
 
-# 16 direction vectors for segment drawing (normalized-ish)
-DIRECTIONS_16 = {
-    0:  (0, -0.72),
-    1:  (math.sqrt(2)/2, -math.sqrt(2)/2),
-    2:  (0.72, 0),
-    3:  (math.sqrt(2)/2, math.sqrt(2)/2),
-    4:  (0, 0.72),
-    5:  (-math.sqrt(2)/2, math.sqrt(2)/2),
-    6:  (-0.72, 0),
-    7:  (-math.sqrt(2)/2, -math.sqrt(2)/2),
-    8:  (0, -0.72),
-    9:  (math.sqrt(2)/2, -math.sqrt(2)/2),
-    10: (0.72, 0),
-    11: (math.sqrt(2)/2, math.sqrt(2)/2),
-    12: (0, 0.72),
-    13: (-math.sqrt(2)/2, math.sqrt(2)/2),
-    14: (-0.72, 0),
-    15: (-math.sqrt(2)/2, -math.sqrt(2)/2),
-}
-
-# --- Example mapping table (shortened) ---
-# digit_segments (0-9) + A..Z (some provided as examples)
-# Each entry is a list/tuple of 16 ints (0/1) representing segments
-BASE_SEGMENTS = [
-    (1,0,0,1,0,0,0,0,0,0,0,0,1,0,0,1),  # 0
-    (1,0,1,0,0,1,1,0,0,0,1,0,1,0,0,0),  # 1
-    (1,0,1,1,0,1,1,0,0,0,1,0,0,0,0,1),  # 2
-    (0,0,1,0,0,0,0,0,0,0,1,0,1,0,0,1),  # 3
-    (0,0,1,1,0,1,0,0,0,0,1,0,1,0,0,1),  # 4
-    (1,0,0,0,0,1,1,0,0,1,1,0,1,0,0,1),  # 5
-    (0,0,0,1,0,1,0,0,0,1,1,0,1,0,0,1),  # 6
-    (1,0,0,0,0,1,1,0,0,1,1,0,1,0,0,0),  # 7
-    (1,0,1,1,0,1,1,0,0,0,1,0,1,0,0,1),  # 8
-    (1,0,1,1,0,1,1,0,0,1,1,0,1,0,0,1),  # 9
-    (1,1,0,1,0,0,0,0,0,1,0,0,1,0,0,0),  # A index 10
-    (1,1,1,0,0,0,0,0,0,0,0,0,0,0,0,0),  # B index 11
-    (1,0,1,1,0,0,0,0,0,1,0,0,0,0,0,1),  # C index 12
-    (1,0,1,0,0,0,0,0,0,1,0,0,0,0,0,1),  # D index 13
-    (1,0,0,1,0,0,0,0,0,1,0,0,1,0,0,1),  # E index 13
-    (1,0,1,1,0,0,0,0,0,1,0,0,1,0,0,1),  # F index 14
-    (1,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0),  # G index 15
-    (1,0,0,1,0,0,0,0,0,1,0,0,1,0,0,0),  # H index 16
-    (0,0,0,1,0,0,0,0,0,1,0,0,1,0,0,1),  # I index 17
-    (1,1,0,0,0,0,0,0,0,1,0,0,1,0,0,1),  # J index 18
-    (1,0,0,0,0,0,0,0,0,1,0,0,0,0,0,0),  # K index 19
-    (1,1,0,1,0,0,0,0,0,1,0,0,1,0,0,1),  # L index 20     
-    (1,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0),  # M index 21
-    (1,1,1,1,0,0,0,0,0,0,0,0,0,0,0,0),  # N index 22
-    (1,0,0,0,0,0,0,0,0,1,0,0,1,0,0,1),  # O index 23
-    (1,1,0,1,0,0,0,0,0,0,0,0,1,0,0,1),  # P index 24
-    (1,1,1,1,0,0,0,0,0,0,1,0,0,0,0,1),  # Q index 25
-    (1,1,1,1,0,0,0,0,0,0,0,0,1,0,0,0),  # R index 26
-    (0,1,1,1,0,0,0,0,0,0,1,0,0,0,0,1),  # S index 27
-    (0,0,1,1,0,0,0,0,0,0,0,0,1,0,0,1),  # T index 28
-    (1,0,1,0,0,0,0,0,0,0,0,0,1,0,0,0),  # U index 29   
-    (1,1,1,1,0,0,0,0,0,1,0,0,1,0,0,0),  # V index 30
-    (1,1,0,1,0,0,0,0,0,0,0,0,0,0,0,1),  # W index 31
-    (0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,1),  # X index 32
-    (0,0,1,1,0,0,0,0,0,1,0,0,0,0,0,1),  # Y index 33
-    (1,1,1,1,0,0,0,0,0,1,0,0,1,0,0,1),  # Z index 34
-    (0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0),  #   index 35 (space)
-]
-
-# build ascii_map from BASE_SEGMENTS
-ascii_to_segments = {}
-segments_to_ascii = {}
-# map digits
-for i in range(10):
-    ascii_to_segments[str(i)] = BASE_SEGMENTS[i]
-    segments_to_ascii[tuple(BASE_SEGMENTS[i])] = str(i)
-# map some letters (A-D)
-letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z',' ']
-for idx, ch in enumerate(letters, start=10):
-    if idx < len(BASE_SEGMENTS):
-        seg = BASE_SEGMENTS[idx]
-        ascii_to_segments[ch] = seg
-        segments_to_ascii[tuple(seg)] = ch
-
-# Helper: create an empty 16-bit pattern
-def empty_pattern():
-    return [0]*16
-
-# Convert a pattern (list of ints) to a printable key
-def pattern_key(pattern):
-    return tuple(int(bool(x)) for x in pattern)
 
 # --- GUI / Canvas drawing ---
 class YautjaTablet:
-    def __init__(self, root):
+    content = _DocField()      # list of characters
+    masks = _DocField()        # packed 16-bit pattern per character
+    layout = _DocField()
+    cursor_index = _DocField()
+    diff_marks = _DocField()   # glyph indices that differ from the compared file
+    journal = _DocField()      # autosave journal, or None
+
+    def __init__(self, root, autosave=AUTOSAVE_DIR, budget=MEMORY_BUDGET):
         self.root = root
         root.title("Yautja Tablet v3.0")
 
@@ -116,37 +68,74 @@ class YautjaTablet:
         self.load_btn = tk.Button(top, text='Load File', command=self.load_file)
         self.load_btn.pack(side='left', padx=4, pady=4)
 
+        self.close_btn = tk.Button(top, text='Close Tab', command=self.close_tab)
+        self.close_btn.pack(side='left', padx=4, pady=4)
+
         self.save_btn = tk.Button(top, text='Save Translation', command=self.save_translation)
         self.save_btn.pack(side='left', padx=4, pady=4)
 
         self.save_pattern_btn = tk.Button(top, text='Save Patterns', command=self.save_patterns)
         self.save_pattern_btn.pack(side='left', padx=4, pady=4)
 
+        self.overview_btn = tk.Button(top, text='Overview', command=self.open_overview)
+        self.overview_btn.pack(side='left', padx=4, pady=4)
+
+        self.export_btn = tk.Button(top, text='Export Image', command=self.export_image)
+        self.export_btn.pack(side='left', padx=4, pady=4)
+
+        self.compare_btn = tk.Button(top, text='Compare', command=self.compare_patterns)
+        self.compare_btn.pack(side='left', padx=4, pady=4)
+
         self.info_label = tk.Label(top, text='Click segments to toggle. Scroll to navigate large files.')
         self.info_label.pack(side='left', padx=8)
 
+        # --- tab bar ---
+        self.tab_bar = tk.Frame(root)
+        self.tab_bar.pack(side='top', fill='x')
+        self.tab_buttons = []
+
         # --- scrollable canvas ---
         canvas_frame = tk.Frame(root)
         canvas_frame.pack(fill='both', expand=True)
 
-        self.canvas = tk.Canvas(canvas_frame, bg='black')
+        self.canvas = tk.Canvas(canvas_frame, bg='black', width=100 + 2*CHARS_PER_LINE*SPACING_X, height=600)
         self.hbar = tk.Scrollbar(canvas_frame, orient='horizontal', command=self.canvas.xview)
         self.vbar = tk.Scrollbar(canvas_frame, orient='vertical', command=self.canvas.yview)
-        self.canvas.configure(xscrollcommand=self.hbar.set, yscrollcommand=self.vbar.set)
+        self.canvas.configure(xscrollcommand=self.hbar.set, yscrollcommand=self.on_yscroll)
+        self.minimap_canvas = tk.Canvas(canvas_frame, bg='black', width=CHARS_PER_LINE*MINIMAP_SCALE, highlightthickness=0)
 
         self.hbar.pack(side='bottom', fill='x')
         self.vbar.pack(side='right', fill='y')
+        self.minimap_canvas.pack(side='right', fill='y')
         self.canvas.pack(side='left', fill='both', expand=True)
 
         self.canvas.bind('<Button-1>', self.on_click)
-
-        # --- data ---
-        self.content = []  # list of characters
-        self.patterns = []  # list of patterns
-        self.item_map = {}  # canvas item -> (char_index, seg_index)
+        self.canvas.bind('<Configure>', self.on_configure)
+        self.minimap_canvas.bind('<Button-1>', self.on_minimap_click)
+
+        # --- documents (autosave=None disables the journals) ---
+        self.item_map = {}  # canvas item -> (char_index, seg_index), active tab only
+        self.drawn_rows = None  # (first, last) rows that have canvas items
+        self.chars_per_line = CHARS_PER_LINE
+        self.workspace = Workspace(self.chars_per_line, budget=budget, autosave=autosave)
+        recovered = self.workspace.recover()
+        self.doc = recovered[0][0] if recovered else self.workspace.new('input.txt')
+        self.workspace.activate(self.doc)
+
+        # --- tiles for overview / export ---
+        self.tiles = TileRenderer()
+        self.tiles.attach(self.masks, self.layout, self.doc)
+        self.overview = None
+        root.protocol('WM_DELETE_WINDOW', self.on_close)
+
+        # --- minimap ---
+        self.minimap = Minimap()
+        self.minimap.attach(self.masks, self.layout)
+        self.minimap_img = None
+        self.minimap_item = self.minimap_canvas.create_image(0, 0, anchor='nw')
+        self.minimap_view = self.minimap_canvas.create_rectangle(0, 0, 0, 0, outline='cyan')
 
         # --- cursor ---
-        self.cursor_index = 0
         self.cursor_blink_state = True
         root.bind('<Key>', self.on_key)
         root.bind('<BackSpace>', self.on_backspace)
@@ -157,32 +146,105 @@ class YautjaTablet:
         self.blink_cursor()
 
         # --- initial load ---
-        try:
-            with open('input.txt','r',encoding='utf-8') as f:
-                self.load_content(f.read())
-        except FileNotFoundError:
-            self.load_content('HELLO')
+        if recovered:
+            for doc, content, masks, edits in recovered:
+                self.switch_to(doc)
+                self.load_content(''.join(content), masks)
+            edits = sum(r[3] for r in recovered)
+            self.info_label.config(text=f'Recovered {len(recovered)} autosaved tabs ({edits} unsaved edits replayed).')
+        else:
+            try:
+                with open('input.txt','r',encoding='utf-8') as f:
+                    self.load_content(f.read())
+            except FileNotFoundError:
+                self.load_content('HELLO')
+        self._update_tabs()
 
     # --- load / save ---
     def load_file(self):
         path = filedialog.askopenfilename(title='Select text file', filetypes=[('Text files','*.txt'),('All files','*.*')])
         if not path: return
         with open(path,'r',encoding='utf-8',errors='ignore') as f:
-            self.load_content(f.read())
+            text = f.read()
+        self.open_text(os.path.basename(path), text)
 
-    def load_content(self, text):
+    def open_text(self, name, text):
+        self.switch_to(self.workspace.new(name))
+        self.load_content(text)
+
+    def load_content(self, text, masks=None):
         text = text.replace('\r','')
-        chars = [ch if ch != '\n' else '\n' for ch in text]
-        self.content = chars
-        self.patterns = []
-        for ch in self.content:
-            if ch == '\n':
-                self.patterns.append(None)
-            else:
-                seg = ascii_to_segments.get(ch.upper(), empty_pattern())
-                self.patterns.append(list(seg))
+        self.content = list(text)
+        if masks is None:
+            self.masks, unmapped = bulk_encode(text)
+        else:
+            self.masks, unmapped = masks, 0
+        if unmapped:
+            self.info_label.config(text=f'{unmapped} unmapped characters shown blank.')
+        else:
+            self.info_label.config(text='Click segments to toggle. Scroll to navigate large files.')
+        self.diff_marks = set()
+        if self.journal:
+            self.journal.reset(self.content, self.masks)
+        self.layout.rebuild(self.content)
+        self.tiles.attach(self.masks, self.layout, self.doc)
+        self.minimap.attach(self.masks, self.layout)
+        self._release(self.workspace.evict())
         self.cursor_index = 0
         self.redraw()
+        self._refresh_overview()
+        self._refresh_minimap()
+
+    # --- tabs: hidden documents keep no canvas items ---
+    def switch_to(self, doc):
+        if doc is self.doc: return
+        self.canvas.delete('all')
+        self.item_map.clear()
+        self.drawn_rows = None
+        self.doc.minimap_state = self.minimap.state()
+        self.doc.tile_bytes = self.tiles.nbytes(self.doc)
+        self.doc = doc
+        doc.tile_bytes = 0   # only hidden tabs count their tiles
+        self._release(self.workspace.activate(doc))
+        self.tiles.attach(self.masks, self.layout, doc)   # reuses doc's tiles from its last visit
+        self.minimap.attach(self.masks, self.layout, doc.minimap_state)
+        doc.minimap_state = None
+        if self.overview is not None:
+            self.overview_canvas.delete('all')
+            self.overview_items.clear()
+        self._update_tabs()
+        self._set_scrollregion()
+        self.canvas.yview_moveto(doc.yview)
+        self.redraw()
+        self._refresh_overview()
+        self._refresh_minimap()
+        self.info_label.config(text=f'{doc.name}: {len(doc)} characters')
+
+    def _release(self, compacted):
+        # compacted tabs give up their tiles and shared block as well
+        for doc in compacted:
+            self.tiles.forget(doc)
+
+    def close_tab(self):
+        closed = self.doc
+        doc = self.workspace.close(closed)
+        if doc is None:
+            self.switch_to(self.workspace.new('untitled'))
+            self.load_content('')
+        else:
+            self.switch_to(doc)
+        self.tiles.forget(closed)
+        self._update_tabs()
+
+    def _update_tabs(self):
+        for b in self.tab_buttons:
+            b.destroy()
+        self.tab_buttons = []
+        for doc in self.workspace.docs:
+            b = tk.Button(self.tab_bar, text=doc.name, relief='sunken' if doc is self.doc else 'raised',
+                          command=lambda d=doc: self.switch_to(d))
+            b.pack(side='left', padx=2)
+            self.tab_buttons.append(b)
 
     def save_translation(self):
         text = self.translate_patterns()
@@ -196,67 +258,234 @@ class YautjaTablet:
     def save_patterns(self):
         try:
             with open('patterns.txt','w',encoding='utf-8') as f:
-                for pat in self.patterns:
-                    if pat is None:
-                        f.write('\n')
-                    else:
-                        f.write(''.join(str(int(bool(x))) for x in pat) + '\n')
+                f.write(format_patterns(self.masks))
+            if self.journal:
+                self.journal.compact()
             messagebox.showinfo('Saved','Patterns saved to patterns.txt')
         except Exception as e:
             messagebox.showerror('Error', f'Could not save patterns: {e}')
 
+    def compare_patterns(self):
+        path = filedialog.askopenfilename(title='Compare with patterns file', filetypes=[('Text files','*.txt'),('All files','*.*')])
+        if not path: return
+        try:
+            with open(path,'rb') as f:
+                data = f.read()
+        except OSError as e:
+            messagebox.showerror('Error', f'Could not compare patterns: {e}')
+            return
+        self.compare_with(os.path.basename(path), data)
+
+    def compare_with(self, name, data):
+        try:
+            diff = diff_masks(parse_patterns(data), self.masks)
+        except ValueError as e:
+            messagebox.showerror('Error', f'Could not compare patterns: {e}')
+            return
+        self.diff_marks = set(diff.changed)
+        extra = diff.old_count - diff.new_count
+        note = f' ({extra} more glyphs in the file)' if extra > 0 else ''
+        self.info_label.config(text=f'{len(diff)} glyphs differ from {name}{note}')
+        self.redraw()
+
     def translate_patterns(self):
-        out_chars = []
-        for pat in self.patterns:
-            if pat is None:
-                out_chars.append('\n')
-            else:
-                ch = segments_to_ascii.get(pattern_key(pat), '?')
-                out_chars.append(ch)
-        return ''.join(out_chars)
+        return decode_masks(self.masks)
+
+    def export_image(self):
+        path = filedialog.asksaveasfilename(title='Export Yautja image', defaultextension='.png',
+                                            filetypes=[('PNG image','*.png'),('PPM image','*.ppm')])
+        if not path: return
+        try:
+            self.tiles.export(path)
+            messagebox.showinfo('Saved', f'Image saved to {path}')
+        except Exception as e:
+            messagebox.showerror('Error', f'Could not export image: {e}')
+
+    # --- redraw canvas: only the rows in view (plus a margin) get items ---
+    def _set_scrollregion(self):
+        width = max(100 + 2*self.chars_per_line*SPACING_X, 800)
+        height = max(self.layout.rows * SPACING_Y + 200, 400)
+        self.canvas.config(scrollregion=(0,0,width,height))
+
+    def _visible_rows(self):
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        return max(0, int(top - 60) // SPACING_Y), max(0, int(bottom - 60) // SPACING_Y)
+
+    def _ensure_drawn(self):
+        if self.drawn_rows is None: return
+        first, last = self._visible_rows()
+        if first < self.drawn_rows[0] or last > self.drawn_rows[1]:
+            self.redraw()
 
-    # --- redraw canvas ---
     def redraw(self):
         self.canvas.delete('all')
         self.item_map.clear()
-        total = len(self.content)
-        lines = (total + CHARS_PER_LINE - 1)//CHARS_PER_LINE
-        width = max(CHARS_PER_LINE * SPACING_X + 200, 800)
-        height = max(lines * SPACING_Y + 200, 400)
-        self.canvas.config(scrollregion=(0,0,width,height))
+        ascii_x = self.chars_per_line * SPACING_X
+        self._set_scrollregion()
 
-        self.canvas.create_text(450,20, text='Yautja text (click segments)', fill='red', font=('DS-Digital',16,'bold'))
-        self.canvas.create_text(970,20, text='Translated ASCII', fill='red', font=('DS-Digital',16,'bold'))
+        self.canvas.create_text(50 + ascii_x//2,20, text='Yautja text (click segments)', fill='red', font=('DS-Digital',16,'bold'))
+        self.canvas.create_text(170 + ascii_x,20, text='Translated ASCII', fill='red', font=('DS-Digital',16,'bold'))
 
-        for i,ch in enumerate(self.content):
-            r = i // CHARS_PER_LINE
-            c = i % CHARS_PER_LINE
-            off_x = 50 + c * SPACING_X
+        first, last = self._visible_rows()
+        self.drawn_rows = (max(0, first - VIEW_MARGIN_ROWS), last + VIEW_MARGIN_ROWS)
+        for r,start,end in self.layout.iter_rows(*self.drawn_rows):
             off_y = 60 + r * SPACING_Y
+            for i in range(start, end):
+                off_x = 50 + (i - start) * SPACING_X
+                self._draw_glyph(i, off_x, off_y, ascii_x)
+
+    def _draw_glyph(self, i, off_x, off_y, ascii_x):
+        if i in self.diff_marks:
+            self.canvas.create_rectangle(off_x-20, off_y-24, off_x+20, off_y+54, outline='yellow')
+        if self.content[i] == '\n':
+            self.canvas.create_text(off_x+20, off_y, text='\u23CE', fill='gray', font=('Arial',20))
+            return
+
+        mask = self.masks[i]
+        for s in range(16):
+            self._draw_segment(i,s,mask>>s & 1, off_x, off_y)
+
+        translated = mask_to_ascii.get(mask, '?')
+        self.canvas.create_text(off_x+ascii_x, off_y+28, text=translated, fill='cyan', font=('DS-Digital',14))
+
+        # draw blinking cursor
+        if i == self.cursor_index and self.cursor_blink_state:
+            self.canvas.create_rectangle(off_x+ascii_x-8, off_y+12, off_x+ascii_x+8, off_y+36, fill='cyan')
+
+    # --- reflow to canvas width ---
+    def on_configure(self,event):
+        cpl = max(1, (event.width - 100) // (2*SPACING_X))
+        if self.layout.reflow(cpl):
+            self.chars_per_line = cpl
+            self.workspace.reflow(cpl)
+            self.tiles.invalidate_all()
+            self.minimap.invalidate_all()
+            self.redraw()
+            self._refresh_overview()
+            self._refresh_minimap()
+        else:
+            self._ensure_drawn()
+
+    # --- overview of the whole document, built from cached tiles ---
+    def open_overview(self):
+        if self.overview is not None:
+            self.overview.lift()
+            return
+        self.overview = tk.Toplevel(self.root)
+        self.overview.title('Yautja overview')
+        self.overview.protocol('WM_DELETE_WINDOW', self._close_overview)
+        self.overview_canvas = tk.Canvas(self.overview, bg='black', width=tile_size(OVERVIEW_SCALE)[0]*3, height=600)
+        bar = tk.Scrollbar(self.overview, orient='vertical', command=self._scroll_overview)
+        self.overview_canvas.configure(yscrollcommand=bar.set)
+        bar.pack(side='right', fill='y')
+        self.overview_canvas.pack(side='left', fill='both', expand=True)
+        self.overview_canvas.bind('<Configure>', lambda e: self._refresh_overview())
+        self.overview_items = {}  # (tx, ty, scale) -> canvas image item
+
+    def _scroll_overview(self, *args):
+        self.overview_canvas.yview(*args)
+        self._refresh_overview()
+
+    def _close_overview(self):
+        self.overview.destroy()
+        self.overview = None
+
+    def _refresh_overview(self):
+        if self.overview is None: return
+        c = self.overview_canvas
+        tw, th = tile_size(OVERVIEW_SCALE)
+        tiles_x, tiles_y = self.tiles.grid()
+        c.config(scrollregion=(0,0,tiles_x*tw,tiles_y*th))
+        for key in [k for k in self.overview_items if k[0] >= tiles_x or k[1] >= tiles_y]:
+            c.delete(self.overview_items.pop(key))
+        top = int(c.canvasy(0)) // th
+        bottom = min(tiles_y, int(c.canvasy(c.winfo_height())) // th + 1)
+        keys = [(tx,ty,OVERVIEW_SCALE) for ty in range(top,bottom) for tx in range(tiles_x)]
+        self.tiles.render(keys)  # misses are rendered in parallel
+        for key in keys:
+            photo = self.tiles.photo(*key)
+            if key in self.overview_items:
+                c.itemconfigure(self.overview_items[key], image=photo)
+            else:
+                self.overview_items[key] = c.create_image(key[0]*tw, key[1]*th, image=photo, anchor='nw')
 
-            if ch == '\n':
-                self.canvas.create_text(off_x+20, off_y, text='\u23CE', fill='gray', font=('Arial',20))
-                continue
-
-            pattern = self.patterns[i]
-            for s in range(16):
-                self._draw_segment(i,s,pattern[s] if pattern else 0, off_x, off_y)
-
-            translated = segments_to_ascii.get(pattern_key(pattern), '?') if pattern else '?'
-            self.canvas.create_text(off_x+800, off_y+28, text=translated, fill='cyan', font=('DS-Digital',14))
+    # tell the tile cache which glyphs changed: one glyph, or re-laid out rows
+    def _touch(self, index, rows=None):
+        for cache in (self.tiles, self.minimap):
+            if rows is None:
+                cache.invalidate_glyph(index)
+            else:
+                cache.invalidate_rows(*rows)
+        self._refresh_overview()
+        self._refresh_minimap()
+
+    # --- minimap: one pixel per glyph, patched in place ---
+    def _refresh_minimap(self):
+        m = self.minimap
+        S = MINIMAP_SCALE
+        if m.resized or self.minimap_img is None:
+            self.minimap_img = tk.PhotoImage(data=m.ppm(), format='PPM').zoom(S)
+            self.minimap_canvas.itemconfigure(self.minimap_item, image=self.minimap_img)
+            self.minimap_canvas.config(width=m.width*S, scrollregion=(0,0,m.width*S,m.height*S))
+        else:
+            for x,y in m.dirty_pixels:
+                self.minimap_img.put(m.color(x,y), to=(x*S, y*S, x*S+S, y*S+S))
+            for y in sorted(m.dirty_rows):
+                row = '{%s}' % ' '.join(c for c in m.row_colors(y) for _ in range(S))
+                self.minimap_img.put(' '.join([row]*S), to=(0, y*S))
+        m.clear_dirty()
+
+    def on_yscroll(self, first, last):
+        self.vbar.set(first, last)
+        self.doc.yview = float(first)
+        self._ensure_drawn()
+        # outline the rows visible in the main canvas
+        height = max(self.layout.rows * SPACING_Y + 200, 400)
+        top = (float(first)*height - 60) / SPACING_Y * MINIMAP_SCALE
+        bottom = (float(last)*height - 60) / SPACING_Y * MINIMAP_SCALE
+        self.minimap_canvas.coords(self.minimap_view, 0, top, self.minimap.width*MINIMAP_SCALE - 1, bottom)
+        self.minimap_canvas.yview_moveto(first)
+
+    def on_minimap_click(self,event):
+        if not self.content: return
+        row = min(int(self.minimap_canvas.canvasy(event.y)) // MINIMAP_SCALE, self.layout.rows-1)
+        col = int(self.minimap_canvas.canvasx(event.x)) // MINIMAP_SCALE
+        self.cursor_index = min(len(self.content)-1, self.layout.index_at(row, col))
+        height = max(self.layout.rows * SPACING_Y + 200, 400)
+        self.canvas.yview_moveto(max(0.0, (row - 1) * SPACING_Y / height))
+        self.redraw()
 
-            # draw blinking cursor
-            if i == self.cursor_index and self.cursor_blink_state:
-                self.canvas.create_rectangle(off_x+792, off_y+12, off_x+808, off_y+36, fill='cyan')
+    # --- autosave: log each edit, fold the journal into a snapshot when it grows ---
+    def _journal_set(self, index, char=None):
+        if self.journal is None: return
+        self.journal.log_set(index, self.masks[index], char)
+        self._maybe_compact()
+
+    def _journal_delete(self, index):
+        if self.journal is None: return
+        self.journal.log_delete(index)
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self.journal.wants_compaction:
+            self.journal.compact()
+
+    def _check_autosave(self):
+        # the journal threads only record failures; report them here on the Tk thread
+        for doc in self.workspace.docs:
+            if doc.journal and doc.journal.error is not None:
+                self.info_label.config(text=f'Autosave failed for {doc.name}: {doc.journal.error}')
+                doc.journal.error = None
+
+    def on_close(self):
+        self.workspace.shutdown()
+        self.tiles.close()
+        self.root.destroy()
 
     # --- segment drawing ---
     def _draw_segment(self,char_index,seg_index,active,off_x,off_y):
-        dx,dy = DIRECTIONS_16[seg_index]
-        offset_y = 1 if seg_index<8 else RADIUS+8
-        x1 = off_x
-        y1 = off_y + offset_y
-        x2 = off_x + dx*RADIUS
-        y2 = off_y + dy*RADIUS + offset_y
+        x1,y1,x2,y2 = segment_line(seg_index, off_x, off_y)
         width = 3 if active else 0
         color = 'red' if active else 'black'
         item = self.canvas.create_line(x1,y1,x2,y2,fill=color,width=width,capstyle='round')
@@ -272,8 +501,10 @@ class YautjaTablet:
         for it in items:
             if it in self.item_map:
                 ci, si = self.item_map[it]
-                if self.patterns[ci] is None: continue
-                self.patterns[ci][si] = 0 if self.patterns[ci][si] else 1
+                if self.masks[ci] & NEWLINE_MASK: continue
+                self.masks[ci] ^= 1 << si
+                self._journal_set(ci)
+                self._touch(ci)
                 self.redraw()
                 return
 
@@ -281,14 +512,22 @@ class YautjaTablet:
     def blink_cursor(self):
         self.cursor_blink_state = not self.cursor_blink_state
         self.redraw()
+        self._check_autosave()
         self.root.after(500, self.blink_cursor)
 
     # --- keyboard events ---
     def on_key(self,event):
-        if event.char and event.char.isprintable():
+        if not self.content: return   # nothing to overtype in an empty document
+        if len(event.char) == 1 and event.char.isprintable():
+            # one glyph per character: upper() can expand ('ß' -> 'SS'), keep those as typed
+            ch = event.char.upper() if len(event.char.upper()) == 1 else event.char
             idx = self.cursor_index
-            self.content[idx] = event.char.upper()
-            self.patterns[idx] = list(ascii_to_segments.get(event.char.upper(), empty_pattern()))
+            old = self.content[idx]
+            rows = self.layout.replace(idx, old, ch)
+            self.content[idx] = ch
+            self.masks[idx] = char_to_mask(ch)
+            self._journal_set(idx, ch)
+            self._touch(idx, rows if old == '\n' else None)
             if self.cursor_index < len(self.content)-1:
                 self.cursor_index += 1
             self.redraw()
@@ -296,8 +535,15 @@ class YautjaTablet:
     def on_backspace(self,event):
         idx = self.cursor_index
         if idx > 0:
+            rows = self.layout.delete(idx-1, self.content[idx-1])
             self.content.pop(idx-1)
-            self.patterns.pop(idx-1)
+            self.masks.pop(idx-1)
+            self._journal_delete(idx-1)
+            if self.diff_marks:
+                # compare marks are glyph indices, and every later glyph just moved
+                self.diff_marks = set()
+                self.info_label.config(text='Compare outlines cleared: glyphs were deleted.')
+            self._touch(idx-1, rows)
             self.cursor_index -= 1
             self.redraw()
 
@@ -312,25 +558,28 @@ class YautjaTablet:
             self.redraw()
 
     def on_up(self,event):
-        r = self.cursor_index // CHARS_PER_LINE
-        c = self.cursor_index % CHARS_PER_LINE
+        r, c = self.layout.position(self.cursor_index)
         if r > 0:
-            r -= 1
-            self.cursor_index = r*CHARS_PER_LINE + c
+            self.cursor_index = self.layout.index_at(r-1, c)
             self.redraw()
 
     def on_down(self,event):
-        r = self.cursor_index // CHARS_PER_LINE
-        c = self.cursor_index % CHARS_PER_LINE
-        max_r = (len(self.content)-1)//CHARS_PER_LINE
-        if r < max_r:
-            r += 1
-            self.cursor_index = min(len(self.content)-1, r*CHARS_PER_LINE + c)
+        r, c = self.layout.position(self.cursor_index)
+        if r < self.layout.rows-1:
+            self.cursor_index = min(len(self.content)-1, self.layout.index_at(r+1, c))
             self.redraw()
    
 
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Yautja Tablet v3')
+    parser.add_argument('--record', metavar='TRACE', help='record input events to a JSON-lines trace (see yautjareplay.py)')
+    args = parser.parse_args()
+
     root = tk.Tk()
     app = YautjaTablet(root)
+    if args.record:
+        from yautjareplay import Recorder
+        Recorder(app, args.record)
     root.mainloop()
@@ -0,0 +1,367 @@
+"""
+Yautja tile renderer
+- Splits the glyph pane into fixed-size pixel tiles (TILE_COLS x TILE_ROWS glyphs)
+- Rasterizes tiles in a process pool; workers read the packed masks
+  from one multiprocessing.shared_memory buffer instead of pickled copies
+- Rendered tiles stay in an LRU cache that feeds both the overview
+  canvas (as PhotoImage tiles) and PNG/PPM export
+- One cache serves every open document: entries are keyed by document,
+  and each document keeps its own shared block, so switching back to a
+  tab reuses its tiles
+- Edits invalidate only the tiles holding the changed glyphs
+"""
+
+import math
+import multiprocessing
+import os
+import struct
+import zlib
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from yautjaglyphs import SPACING_X, SPACING_Y, NEWLINE_MASK, segment_line
+
+# --- Config ---
+TILE_COLS = 8               # glyph columns per tile
+TILE_ROWS = 4               # glyph rows per tile
+GLYPH_X, GLYPH_Y = 20, 30   # glyph origin inside its SPACING_X x SPACING_Y cell
+CACHE_BYTES = 256 << 20
+# the GUI process holds a Tk connection and journal threads, so workers must not be forked from it
+MP_START = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+RED = b'\xff\x00\x00'
+GRAY = b'\x80\x80\x80'
+
+# return marker, drawn in gray like the canvas
+NEWLINE_STROKES = ((GLYPH_X+10, GLYPH_Y-10, GLYPH_X+10, GLYPH_Y+4),
+                   (GLYPH_X+10, GLYPH_Y+4, GLYPH_X-8, GLYPH_Y+4),
+                   (GLYPH_X-8, GLYPH_Y+4, GLYPH_X-2, GLYPH_Y-2))
+
+
+def cell_size(scale):
+    return max(1, round(SPACING_X * scale)), max(1, round(SPACING_Y * scale))
+
+def tile_size(scale):
+    cw, ch = cell_size(scale)
+    return TILE_COLS * cw, TILE_ROWS * ch
+
+
+# --- rasterizer (runs in the workers) ---
+_sprites = {}    # (mask, scale) -> [(y, row bytes)] or None for blank glyphs
+_attached = {}   # shared memory name -> (SharedMemory, 'I' view)
+
+def _stroke(pixels, cw, ch, x1, y1, x2, y2, half):
+    # every pixel whose centre lies within ``half`` of the segment
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx*dx + dy*dy or 1e-9
+    for py in range(max(0, int(min(y1, y2) - half)), min(ch, int(max(y1, y2) + half) + 1)):
+        for px in range(max(0, int(min(x1, x2) - half)), min(cw, int(max(x1, x2) + half) + 1)):
+            cx, cy = px + 0.5, py + 0.5
+            t = max(0.0, min(1.0, ((cx - x1)*dx + (cy - y1)*dy) / length2))
+            ex, ey = cx - (x1 + t*dx), cy - (y1 + t*dy)
+            if ex*ex + ey*ey <= half*half:
+                pixels[py*cw + px] = True
+
+def _sprite(mask, scale):
+    key = (mask, scale)
+    if key in _sprites:
+        return _sprites[key]
+    cw, ch = cell_size(scale)
+    pixels = [False] * (cw * ch)
+    half = max(1.0, 3 * scale) / 2
+    if mask & NEWLINE_MASK:
+        color, strokes = GRAY, NEWLINE_STROKES
+    else:
+        color = RED
+        strokes = [segment_line(s, GLYPH_X, GLYPH_Y) for s in range(16) if mask >> s & 1]
+    for x1, y1, x2, y2 in strokes:
+        _stroke(pixels, cw, ch, x1*scale, y1*scale, x2*scale, y2*scale, half)
+    rows = []
+    for y in range(ch):
+        line = pixels[y*cw:(y+1)*cw]
+        if any(line):
+            rows.append((y, b''.join(color if p else b'\0\0\0' for p in line)))
+    _sprites[key] = rows or None
+    return _sprites[key]
+
+def _rasterize(view, spans, scale):
+    """RGB bytes of one tile; ``spans`` is [(row_in_tile, start, end)] glyph ranges."""
+    cw, ch = cell_size(scale)
+    tw, th = tile_size(scale)
+    stride = tw * 3
+    buf = bytearray(stride * th)
+    for r, lo, hi in spans:
+        for k, mask in enumerate(view[lo:hi]):
+            sprite = _sprite(mask, scale)
+            if sprite is None:
+                continue
+            base = r*ch*stride + k*cw*3
+            for y, line in sprite:
+                o = base + y*stride
+                buf[o:o+len(line)] = line
+    return bytes(buf)
+
+def _attach(name):
+    if name not in _attached:
+        for shm, view in _attached.values():
+            view.release()
+            shm.close()
+        _attached.clear()
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = (shm, shm.buf.cast('I'))
+    return _attached[name][1]
+
+def _render_tile(name, spans, scale):
+    return _rasterize(_attach(name), spans, scale)
+
+
+class SharedMasks:
+    """Packed masks mirrored into a shared memory block for the workers."""
+
+    def __init__(self, masks):
+        self.shm = None
+        self.view = None
+        self.capacity = 0
+        self.length = 0   # len(masks) at the last sync
+        self.resize(masks)
+
+    def resize(self, masks):
+        self.close()
+        self.capacity = max(4096, len(masks) + len(masks)//4)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.capacity * 4)
+        self.view = self.shm.buf.cast('I')
+        self.sync(masks)
+
+    def sync(self, masks, start=0, end=None):
+        end = len(masks) if end is None else min(end, len(masks))
+        if len(masks) > self.capacity:
+            self.resize(masks)
+        elif start < end:
+            self.view[start:end] = memoryview(masks)[start:end]
+        self.length = len(masks)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        if self.shm is not None:
+            self.view.release()
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = self.view = None
+
+
+class TileRenderer:
+    """Tile cache over the attached document's masks and LayoutIndex.
+
+    Keys are (tx, ty, scale) of the attached document; internally each
+    entry is also keyed by the document, so hidden documents keep theirs.
+    ``workers=0`` renders in-process.
+    """
+
+    def __init__(self, workers=None, cache_bytes=CACHE_BYTES):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.cache_bytes = cache_bytes
+        self.cache = OrderedDict()
+        self.cached_bytes = 0
+        self.photos = {}
+        self.rendered = 0
+        self._pool = None
+        self._docs = {}       # doc -> (SharedMasks, masks, chars_per_line) the tiles were drawn from
+        self._doc = None
+        self._shared = None
+        self.masks = array('I')
+        self.layout = None
+
+    # --- document binding ---
+    def attach(self, masks, layout, doc=None):
+        """Show ``doc``; tiles from its last attach are kept unless its masks
+        object or line width changed since."""
+        self.masks = masks
+        self.layout = layout
+        self._doc = doc
+        if doc not in self._docs:
+            self._docs[doc] = (SharedMasks(masks), None, None)
+        self._shared, drawn, cpl = self._docs[doc]
+        if drawn is not masks or cpl != layout.chars_per_line:
+            self.invalidate_all()
+
+    def nbytes(self, doc):
+        """Memory held for ``doc``: its shared block and cached tiles."""
+        if doc not in self._docs:
+            return 0
+        cached = sum(len(data) for key, data in self.cache.items() if key[0] is doc)
+        return self._docs[doc][0].capacity * 4 + cached
+
+    def forget(self, doc):
+        """Drop a closed document's tiles and shared block."""
+        if doc not in self._docs:
+            return
+        shared = self._docs.pop(doc)[0]
+        self._drop(doc, lambda k: True)
+        shared.close()
+        if doc is self._doc:
+            self._doc = self._shared = None
+
+    def grid(self):
+        """(tiles across, tiles down) for the current layout."""
+        return (math.ceil(self.layout.chars_per_line / TILE_COLS),
+                math.ceil(self.layout.rows / TILE_ROWS))
+
+    # --- invalidation ---
+    def _drop(self, doc, match):
+        # ``match`` sees the public (tx, ty, scale) part of the key
+        for key in [k for k in self.cache if k[0] is doc and match(k[1:])]:
+            self.cached_bytes -= len(self.cache.pop(key))
+            self.photos.pop(key, None)
+
+    def invalidate_all(self):
+        """The attached document was reloaded or reflowed."""
+        self._drop(self._doc, lambda k: True)
+        self._shared.sync(self.masks)
+        self._docs[self._doc] = (self._shared, self.masks, self.layout.chars_per_line)
+
+    def invalidate_glyph(self, index):
+        """Glyph ``index`` changed in place."""
+        self._shared.sync(self.masks, index, index + 1)
+        row, col = self.layout.position(index)
+        tx, ty = col // TILE_COLS, row // TILE_ROWS
+        self._drop(self._doc, lambda k: k[0] == tx and k[1] == ty)
+
+    def invalidate_rows(self, first_row, last_row=None):
+        """Rows first_row..last_row were re-laid out (None: through the end)."""
+        start = self.layout.row_range(first_row)[0]
+        end = None if last_row is None else self.layout.row_range(last_row)[1]
+        if len(self.masks) != self._shared.length:
+            # an insert or delete moved every later glyph to a new index;
+            # their tiles still look the same, but the shared copy must follow
+            end = None
+        self._shared.sync(self.masks, start, end)
+        lo = first_row // TILE_ROWS
+        hi = math.inf if last_row is None else last_row // TILE_ROWS
+        self._drop(self._doc, lambda k: lo <= k[1] <= hi)
+
+    # --- rendering ---
+    def _spans(self, tx, ty):
+        c0 = tx * TILE_COLS
+        spans = []
+        for r, start, end in self.layout.iter_rows(ty * TILE_ROWS, ty * TILE_ROWS + TILE_ROWS - 1):
+            lo = start + c0
+            hi = min(end, lo + TILE_COLS)
+            if lo < hi:
+                spans.append((r - ty * TILE_ROWS, lo, hi))
+        return spans
+
+    def _store(self, key, data):
+        self.cache[key] = data
+        self.cached_bytes += len(data)
+        self.rendered += 1
+        while self.cached_bytes > self.cache_bytes and len(self.cache) > 1:
+            old, old_data = self.cache.popitem(last=False)
+            self.cached_bytes -= len(old_data)
+            self.photos.pop(old, None)
+
+    def render(self, keys):
+        """Return {key: RGB bytes} for (tx, ty, scale) keys, rendering misses."""
+        out = {}
+        missing = []
+        for key in keys:
+            full = (self._doc, *key)
+            if full in self.cache:
+                self.cache.move_to_end(full)
+                out[key] = self.cache[full]
+            else:
+                missing.append(key)
+        if not missing:
+            return out
+        jobs = [(self._spans(tx, ty), scale) for tx, ty, scale in missing]
+        if self.workers and len(missing) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(MP_START))
+            name = self._shared.name
+            futures = [self._pool.submit(_render_tile, name, spans, scale) for spans, scale in jobs]
+            results = [f.result() for f in futures]
+        else:
+            results = [_rasterize(self._shared.view, spans, scale) for spans, scale in jobs]
+        for key, data in zip(missing, results):
+            self._store((self._doc, *key), data)
+            out[key] = data
+        return out
+
+    def photo(self, tx, ty, scale):
+        """Cached tile as a tk.PhotoImage (needs a Tk root)."""
+        import tkinter as tk
+        key = (tx, ty, scale)
+        full = (self._doc, *key)
+        if full not in self.photos:
+            tw, th = tile_size(scale)
+            data = self.render([key])[key]
+            self.photos[full] = tk.PhotoImage(data=b'P6 %d %d 255\n' % (tw, th) + data, format='PPM')
+        return self.photos[full]
+
+    # --- export ---
+    def iter_rows(self, scale=1.0, batch=64):
+        """Yield the full glyph pane one RGB pixel row at a time."""
+        tiles_x, tiles_y = self.grid()
+        cw, ch = cell_size(scale)
+        tw, th = tile_size(scale)
+        width = self.layout.chars_per_line * cw
+        height = self.layout.rows * ch
+        band_rows = max(1, batch // max(1, tiles_x))
+        for ty0 in range(0, tiles_y, band_rows):
+            bands = range(ty0, min(tiles_y, ty0 + band_rows))
+            tiles = self.render([(tx, ty, scale) for ty in bands for tx in range(tiles_x)])
+            for ty in bands:
+                row_tiles = [tiles[(tx, ty, scale)] for tx in range(tiles_x)]
+                for y in range(min(th, height - ty * th)):
+                    o = y * tw * 3
+                    yield b''.join(t[o:o + tw*3] for t in row_tiles)[:width*3]
+
+    def export(self, path, scale=1.0):
+        """Write the glyph pane to ``path`` as PNG (or binary PPM for .ppm)."""
+        cw, ch = cell_size(scale)
+        width = self.layout.chars_per_line * cw
+        height = self.layout.rows * ch
+        rows = self.iter_rows(scale)
+        with open(path, 'wb') as f:
+            if path.lower().endswith('.ppm'):
+                f.write(b'P6 %d %d 255\n' % (width, height))
+                for row in rows:
+                    f.write(row)
+            else:
+                _write_png(f, width, height, rows)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        for shared, _, _ in self._docs.values():
+            shared.close()
+        self._docs.clear()
+        self._shared = None
+        self.photos.clear()
+
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+def _write_png(f, width, height, rows):
+    f.write(b'\x89PNG\r\n\x1a\n')
+    f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+    comp = zlib.compressobj(6)
+    pending = []
+    size = 0
+    for row in rows:
+        data = comp.compress(b'\0' + row)
+        if data:
+            pending.append(data)
+            size += len(data)
+            if size >= 1 << 16:
+                f.write(_png_chunk(b'IDAT', b''.join(pending)))
+                pending, size = [], 0
+    pending.append(comp.flush())
+    f.write(_png_chunk(b'IDAT', b''.join(pending)))
+    f.write(_png_chunk(b'IEND', b''))
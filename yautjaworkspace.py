@@ -0,0 +1,181 @@
+"""
+Yautja workspace
+- Several documents (tabs) in one process, sharing the glyph tables and
+  the tile / minimap caches of the window that shows them
+- Only the active document is drawn; hidden ones keep no canvas items
+- Hidden documents stay ready to show until the workspace passes its
+  memory budget, then the least recently used are compacted to their
+  text and packed masks (layout, character list and minimap rebuilt on
+  activation); the budget counts a hidden tab's tile cache and shared
+  block too, and the window drops those for every compacted tab
+- Each document has its own autosave journal in a numbered subdirectory
+"""
+
+import os
+import sys
+from array import array
+from collections import OrderedDict
+
+from yautjajournal import Journal
+from yautjalayout import LayoutIndex
+
+# --- Config ---
+MEMORY_BUDGET = 512 << 20   # bytes of document data across all tabs
+
+
+class Document:
+    """One tab: text, packed masks and the per-document editing state."""
+
+    def __init__(self, name, chars_per_line, journal=None):
+        self.name = name
+        self.content = []          # list of characters; None while compacted
+        self.text = None           # str form of content while compacted
+        self.masks = array('I')
+        self.layout = LayoutIndex(self.content, chars_per_line)
+        self.cursor_index = 0
+        self.diff_marks = set()
+        self.yview = 0.0           # scroll position to restore on activation
+        self.minimap_state = None  # Minimap.state() while hidden
+        self.tile_bytes = 0        # TileRenderer.nbytes() kept for this tab while hidden
+        self.journal = journal
+
+    @property
+    def compacted(self):
+        return self.content is None
+
+    def compact(self):
+        """Keep only the text and the packed masks."""
+        if self.compacted: return
+        self.text = ''.join(self.content)
+        self.content = None
+        self.layout = None
+        self.minimap_state = None
+        self.tile_bytes = 0        # the window forgets the tiles of compacted tabs
+
+    def expand(self, chars_per_line):
+        """Rebuild the character list and layout; reflow to the current width."""
+        if self.compacted:
+            self.content = list(self.text)
+            self.text = None
+            self.layout = LayoutIndex(self.content, chars_per_line)
+        else:
+            self.layout.reflow(chars_per_line)
+
+    def nbytes(self):
+        size = self.masks.itemsize * len(self.masks) + self.tile_bytes
+        if self.minimap_state is not None:
+            size += len(self.minimap_state[2])
+        if self.compacted:
+            return size + sys.getsizeof(self.text)
+        return size + sys.getsizeof(self.content) + self.layout.nbytes()
+
+    def __len__(self):
+        return len(self.masks)
+
+
+class Workspace:
+    """Open documents in tab order, with LRU compaction under a memory budget.
+
+    ``autosave`` is the root directory for the per-document journals
+    (None disables autosave).
+    """
+
+    def __init__(self, chars_per_line, budget=MEMORY_BUDGET, autosave=None):
+        self.chars_per_line = chars_per_line
+        self.budget = budget
+        self.autosave = autosave
+        self.docs = []
+        self.active = None
+        self._recent = OrderedDict()   # doc -> None, least recently used first
+        self._next_id = 1 + max(self._journal_ids(), default=0)
+
+    # --- autosave directories ---
+    def _journal_ids(self):
+        try:
+            names = os.listdir(self.autosave) if self.autosave else []
+        except OSError:
+            return []
+        return sorted(int(n) for n in names if n.isdigit())
+
+    def _journal(self, doc_id):
+        if not self.autosave: return None
+        return Journal(os.path.join(self.autosave, str(doc_id)))
+
+    def recover(self):
+        """Documents left by a crashed session, as [(doc, content, masks, edits)]."""
+        found = []
+        for doc_id in self._journal_ids():
+            journal = self._journal(doc_id)
+            state = journal.recover()
+            if state is None:
+                journal.close(discard=True)
+                continue
+            doc = Document(f'recovered {doc_id}', self.chars_per_line, journal)
+            self.docs.append(doc)
+            found.append((doc, *state))
+        return found
+
+    # --- tabs ---
+    def new(self, name):
+        doc = Document(name, self.chars_per_line, self._journal(self._next_id))
+        self._next_id += 1
+        self.docs.append(doc)
+        return doc
+
+    def activate(self, doc):
+        """Make ``doc`` the shown document and enforce the memory budget.
+
+        Returns the documents evict() compacted.
+        """
+        doc.expand(self.chars_per_line)
+        self.active = doc
+        self._recent.pop(doc, None)
+        self._recent[doc] = None
+        return self.evict()
+
+    def close(self, doc):
+        """Drop ``doc`` and its autosave; returns the tab to show next (or None)."""
+        i = self.docs.index(doc)
+        self.docs.remove(doc)
+        self._recent.pop(doc, None)
+        if doc.journal:
+            doc.journal.close(discard=True)
+        if doc is self.active:
+            self.active = None
+            if self.docs:
+                return self.docs[min(i, len(self.docs) - 1)]
+        return self.active
+
+    def reflow(self, chars_per_line):
+        # hidden documents reflow lazily in expand()
+        self.chars_per_line = chars_per_line
+
+    # --- memory budget ---
+    def nbytes(self):
+        return sum(doc.nbytes() for doc in self.docs)
+
+    def evict(self):
+        """Compact least recently used hidden documents until under budget; returns them."""
+        total = self.nbytes()
+        evicted = []
+        for doc in list(self._recent):
+            if total <= self.budget:
+                break
+            if doc is self.active or doc.compacted:
+                continue
+            before = doc.nbytes()
+            doc.compact()
+            total -= before - doc.nbytes()
+            evicted.append(doc)
+        return evicted
+
+    def shutdown(self):
+        """Clean exit: stop every journal and remove the autosave files."""
+        for doc in self.docs:
+            if doc.journal:
+                doc.journal.close(discard=True)
+        if self.autosave:
+            try:
+                os.rmdir(self.autosave)
+            except OSError:
+                pass